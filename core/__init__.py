@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+Qt-free game core of the Husbando Gacha add-on.
+Rarity rolls, rewards, fusion, leveling, and persistence live here and can be
+imported without Anki's GUI; the dialogs in the ui package build on top of it.
+"""
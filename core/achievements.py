@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Achievement engine: declarative rules indexed by the events that can
+trigger them, checked against progress counters that are kept up to date
+incrementally and saved under achievements["progress"].
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .constants import ACHIEVEMENTS
+
+ACHIEVEMENT_EVENTS = ("pull", "answer", "fusion", "level_up", "login", "spend")
+
+
+def index_achievements(rules: Iterable[Mapping[str, Any]]) -> Dict[str, Tuple[Mapping[str, Any], ...]]:
+    """Group the rules by event type; rules with an unknown event or no target are dropped."""
+    index = {event: [] for event in ACHIEVEMENT_EVENTS}
+    for rule in rules:
+        if not isinstance(rule.get("target"), int) or not rule.get("stat"):
+            continue
+        for event in rule.get("on", ()):
+            if event in index:
+                index[event].append(rule)
+    return {event: tuple(event_rules) for event, event_rules in index.items()}
+
+def record_progress(
+    achievements: Dict[str, Any],
+    index: Mapping[str, Tuple[Mapping[str, Any], ...]],
+    event: str,
+    add: Optional[Mapping[str, int]] = None,
+    best: Optional[Mapping[str, int]] = None,
+    reset: Iterable[str] = (),
+) -> List[Mapping[str, Any]]:
+    """
+    Update the progress counters for one event and unlock the rules it completes.
+    add increments counters, best raises them to at least a value, and reset
+    zeroes them. Only the rules indexed under the event whose counter changed
+    are checked. Returns the newly unlocked rules.
+    """
+    progress = achievements.setdefault("progress", {})
+    changed = set()
+    for stat in reset:
+        progress[stat] = 0
+    for stat, amount in (add or {}).items():
+        if amount:
+            progress[stat] = progress.get(stat, 0) + amount
+            changed.add(stat)
+    for stat, value in (best or {}).items():
+        if value > progress.get(stat, 0):
+            progress[stat] = value
+            changed.add(stat)
+    unlocked = []
+    for rule in index.get(event, ()):
+        if rule["stat"] in changed and rule["id"] not in achievements and progress[rule["stat"]] >= rule["target"]:
+            achievements[rule["id"]] = True
+            unlocked.append(rule)
+    return unlocked
+
+achievement_index = index_achievements(ACHIEVEMENTS)
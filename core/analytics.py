@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Per-answer event log: a columnar ring buffer in memory, flushed in binary
+blocks to a rotating log file, with whole-column queries for the session view.
+"""
+
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Any, Dict, Optional
+
+from .constants import (
+    ANSWER_LOG_BACKUPS, ANSWER_LOG_CAPACITY, ANSWER_LOG_FLUSH_EVERY,
+    ANSWER_LOG_MAX_BYTES, SESSION_TRAJECTORY_POINTS,
+)
+
+# Column name and array typecode, in the order they are stored in a block
+ANSWER_COLUMNS = (
+    ("time", "d"),      # Unix timestamp of the answer
+    ("ease", "b"),      # 1-4
+    ("points", "i"),    # Points awarded
+    ("hp_delta", "h"),  # Change of the buddy's HP
+    ("xp_delta", "i"),  # XP granted to the buddy
+    ("hp", "h"),        # Buddy HP after the answer, -1 without a buddy
+)
+BLOCK_MAGIC = b"HGAL"
+BLOCK_HEADER = struct.Struct("<4sHI")  # magic, format version, event count
+BLOCK_VERSION = 1
+
+
+class AnswerLog:
+    """
+    Columnar ring buffer of per-answer events.
+    Every field lives in its own preallocated array, so appending an answer
+    is a handful of index stores; every flush_every answers the pending rows
+    are written to the log file as one block.
+    """
+
+    def __init__(self, capacity: int = ANSWER_LOG_CAPACITY, flush_every: int = ANSWER_LOG_FLUSH_EVERY):
+        self.capacity = capacity
+        self.flush_every = min(flush_every, capacity)
+        self.columns = {name: array(code, [0]) * capacity for name, code in ANSWER_COLUMNS}
+        self.total = 0       # Answers appended since the session started
+        self.flushed = 0     # Answers already written to the log file
+        self.path = None     # Log file; the log stays in memory while None
+        self.session_started = time.time()
+
+    def append(self, ease: int, points: int, hp_delta: int, xp_delta: int, hp: int):
+        """Record one answer."""
+        i = self.total % self.capacity
+        columns = self.columns
+        columns["time"][i] = time.time()
+        columns["ease"][i] = ease
+        columns["points"][i] = points
+        columns["hp_delta"][i] = hp_delta
+        columns["xp_delta"][i] = xp_delta
+        columns["hp"][i] = hp
+        self.total += 1
+        if self.total - self.flushed >= self.flush_every:
+            self.flush()
+
+    def column(self, name: str, start: int, end: int) -> array:
+        """Return answers [start, end) of one column, oldest first."""
+        start = max(start, self.total - self.capacity)
+        if end <= start:
+            return array(self.columns[name].typecode)
+        values = self.columns[name]
+        first, count = start % self.capacity, end - start
+        if first + count <= self.capacity:
+            return values[first:first + count]
+        return values[first:] + values[:first + count - self.capacity]
+
+    def flush(self):
+        """Write the answers recorded since the last flush as one block."""
+        pending_from, self.flushed = self.flushed, self.total
+        if self.path is None or pending_from == self.total:
+            return
+        blocks = [BLOCK_HEADER.pack(BLOCK_MAGIC, BLOCK_VERSION, self.total - pending_from)]
+        for name, _ in ANSWER_COLUMNS:
+            values = self.column(name, pending_from, self.total)
+            if sys.byteorder == "big":
+                values.byteswap()
+            blocks.append(values.tobytes())
+        data = b"".join(blocks)
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > ANSWER_LOG_MAX_BYTES:
+                rotate_log(self.path)
+            with open(self.path, "ab") as f:
+                f.write(data)
+        except OSError:
+            # Analytics must never get in the way of reviewing
+            pass
+
+    def session_summary(self) -> Dict[str, Any]:
+        """
+        Summarize the answers of this session that are still in the buffer:
+        answer count, points and points per hour, ease mix, and a downsampled
+        HP trajectory of the buddy.
+        """
+        end = self.total
+        start = max(0, end - self.capacity)
+        count = end - start
+        points = sum(self.column("points", start, end))
+        ease = self.column("ease", start, end).tobytes()
+        hp = self.column("hp", start, end)
+        # Once the buffer wrapped, the rate covers the answers still in it
+        window_started = self.session_started if start == 0 else self.column("time", start, start + 1)[0]
+        hours = max(time.time() - window_started, 60) / 3600
+        step = max(1, -(-count // SESSION_TRAJECTORY_POINTS))
+        return {
+            "answers": count,
+            "points": points,
+            "points_per_hour": points / hours,
+            "ease_mix": {value: ease.count(bytes((value,))) for value in (1, 2, 3, 4)},
+            # Sampled backwards from the latest answer, so the current HP is always included
+            "hp_trajectory": [value for value in hp[::-step][::-1] if value >= 0],
+        }
+
+def rotate_log(path: str):
+    """Shift path -> path.1 -> ... -> path.N, dropping the oldest file."""
+    for n in range(ANSWER_LOG_BACKUPS - 1, 0, -1):
+        if os.path.exists(f"{path}.{n}"):
+            os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+    os.replace(path, f"{path}.1")
+
+def read_answer_log(path: str) -> Optional[Dict[str, array]]:
+    """Read all blocks of a log file back into one array per column."""
+    if not os.path.exists(path):
+        return None
+    columns = {name: array(code) for name, code in ANSWER_COLUMNS}
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + BLOCK_HEADER.size <= len(data):
+        magic, version, count = BLOCK_HEADER.unpack_from(data, offset)
+        row_size = sum(array(code).itemsize for _, code in ANSWER_COLUMNS)
+        if magic != BLOCK_MAGIC or version != BLOCK_VERSION or offset + BLOCK_HEADER.size + row_size * count > len(data):
+            # Unknown format or a block cut short by a crash
+            break
+        offset += BLOCK_HEADER.size
+        for name, code in ANSWER_COLUMNS:
+            values = array(code)
+            size = values.itemsize * count
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            columns[name].extend(values)
+            offset += size
+    return columns
+
+answer_log = AnswerLog()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Compilation of the raw configuration dict into an immutable snapshot.
+"""
+
+import math
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Tuple
+
+from .constants import (
+    ANSWER_REWARDS, BUDDY_ROTATION_MODES, DEFAULT_PULL_COST, DEFAULT_ROTATION_CARDS,
+    OVERLAY_MODES, OVERLAY_STYLES, RARITIES,
+)
+from .leveling import compile_level_curve
+from .pity import build_pity_tables, compile_pity_rules
+
+
+class ConfigSnapshot(NamedTuple):
+    """Immutable, validated view of the configuration used by hot paths."""
+    pull_cost: int
+    husbando_folder: str
+    show_during_review: bool
+    overlay_mode: str            # "full" (styled HTML) or "lite" (one pre-rendered image)
+    buddy_rotation: str          # "off", "cards" (every buddy_rotation_cards answers), or "deck"
+    buddy_rotation_cards: int
+    rarity_order: Tuple[str, ...]
+    rarity_rank: Mapping[str, int]
+    rarity_colors: Mapping[str, str]
+    rarity_cumulative: Tuple[float, ...]   # Normalized cumulative chances, aligned with rarity_order
+    pity_rules: Tuple[Tuple[str, int, int, float], ...]   # (rarity, soft, hard, step), highest first
+    pity_tables: Mapping[Tuple[int, ...], Tuple[float, ...]]   # Pity counters -> cumulative chances
+    overlay_styles: Mapping[str, Mapping[str, str]]
+    answer_rewards: Mapping[int, Mapping[str, int]]
+    level_curve: Tuple[int, ...]   # Total XP needed to reach level i + 1
+
+def compile_config(raw: Dict[str, Any]) -> ConfigSnapshot:
+    """Validate the raw config dict and compile it into lookup tables."""
+    pull_cost = raw.get("pullCost", DEFAULT_PULL_COST)
+    if not isinstance(pull_cost, int) or pull_cost < 1:
+        pull_cost = DEFAULT_PULL_COST
+    
+    rarities = raw.get("rarities")
+    if not isinstance(rarities, dict) or not rarities:
+        rarities = RARITIES
+    chances = []
+    for data in rarities.values():
+        chance = data.get("chance", 0) if isinstance(data, dict) else 0
+        chances.append(float(chance) if isinstance(chance, (int, float)) and chance > 0 else 0.0)
+    if sum(chances) <= 0:
+        rarities = RARITIES
+        chances = [data["chance"] for data in RARITIES.values()]
+    total = sum(chances)
+    cumulative = []
+    running = 0.0
+    for chance in chances:
+        running += chance / total
+        cumulative.append(running)
+    cumulative[-1] = 1.0
+    
+    rarity_order = tuple(rarities)
+    colors = {name: data["color"] for name, data in RARITIES.items()}
+    for name, data in rarities.items():
+        color = data.get("color") if isinstance(data, dict) else None
+        colors[name] = color if isinstance(color, str) and color.startswith("#") else colors.get(name, RARITIES["common"]["color"])
+    
+    buddy_rotation = raw.get("buddyRotation", "off")
+    if buddy_rotation not in BUDDY_ROTATION_MODES:
+        buddy_rotation = "off"
+    rotation_cards = raw.get("buddyRotationCards", DEFAULT_ROTATION_CARDS)
+    if not isinstance(rotation_cards, int) or rotation_cards < 1:
+        rotation_cards = DEFAULT_ROTATION_CARDS
+    
+    overlay_mode = raw.get("overlayMode", "full")
+    if overlay_mode not in OVERLAY_MODES:
+        overlay_mode = "full"
+    
+    pity_rules = compile_pity_rules(raw.get("pity"), rarity_order)
+    
+    answer_rewards = {ease: dict(reward) for ease, reward in ANSWER_REWARDS.items()}
+    raw_rewards = raw.get("answerRewards")
+    if not isinstance(raw_rewards, dict):
+        raw_rewards = {}
+    for ease, reward in raw_rewards.items():
+        if str(ease).isdigit() and int(ease) in answer_rewards and isinstance(reward, dict):
+            # Non-numeric amounts keep their defaults
+            answer_rewards[int(ease)].update({
+                k: int(v) for k, v in reward.items()
+                if k in ("hp", "xp", "points") and isinstance(v, (int, float)) and math.isfinite(v)
+            })
+    
+    return ConfigSnapshot(
+        pull_cost=pull_cost,
+        husbando_folder=str(raw.get("husbandoFolder", "") or ""),
+        show_during_review=bool(raw.get("showDuringReview", True)),
+        overlay_mode=overlay_mode,
+        buddy_rotation=buddy_rotation,
+        buddy_rotation_cards=rotation_cards,
+        rarity_order=rarity_order,
+        rarity_rank=MappingProxyType({name: rank for rank, name in enumerate(rarity_order)}),
+        rarity_colors=MappingProxyType(colors),
+        rarity_cumulative=tuple(cumulative),
+        pity_rules=pity_rules,
+        pity_tables=MappingProxyType(build_pity_tables(rarity_order, tuple(cumulative), pity_rules)),
+        overlay_styles=MappingProxyType({name: MappingProxyType(style) for name, style in OVERLAY_STYLES.items()}),
+        answer_rewards=MappingProxyType({ease: MappingProxyType(reward) for ease, reward in answer_rewards.items()}),
+        level_curve=compile_level_curve(raw.get("levelCurve")),
+    )
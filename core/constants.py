@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Constants shared by the Husbando Gacha core and UI modules.
+"""
+
+ADDON_NAME = "Husbando Gacha"
+CONFIG_FILE = "husbando_gacha_config.json"
+COLLECTION_FILE = "husbando_collection.json"
+DEFAULT_PULL_COST = 50
+DEFAULT_REWARDS = {
+    "newCard": 1,          # Points for learning a new card
+    "reviewCorrect": 1,      # Points for correct review
+    "reviewHard": 1,         # Points for 'hard' on a review
+    "reviewWrong": 0,        # Points for incorrect review
+    "streak": {              # Bonus points for streaks
+        "5": 5,
+        "10": 10,
+        "25": 25,
+        "50": 50,
+        "100": 100
+    }
+}
+RARITIES = {
+    "common": {"chance": 0.60, "color": "#A0A0A0"},
+    "rare": {"chance": 0.30, "color": "#4169E1"},
+    "epic": {"chance": 0.08, "color": "#9932CC"},
+    "legendary": {"chance": 0.02, "color": "#FFD700"}
+}
+FUSION_ORDER = ["common", "rare", "epic", "legendary"]
+FUSION_COST = 3  # Copies consumed per fusion step
+LUCKY_ROLL_COST = 20
+LUCKY_ROLL_OUTCOMES = [("Jackpot", 100), ("Bonus XP", 50), ("Small Prize", 10), ("Miss", 0)]
+ANSWER_REWARDS = {
+    1: {"hp": -5, "xp": 0, "points": 0},    # Again
+    2: {"hp": -2, "xp": 2, "points": 2},    # Hard
+    3: {"hp": 1,  "xp": 5, "points": 5},    # Good
+    4: {"hp": 10, "xp": 10, "points": 10},  # Easy
+}
+# Reviewer overlay styles per rarity
+OVERLAY_STYLES = {
+    "legendary": {
+        "badge": "LEGENDARY",
+        "badge_bg": "linear-gradient(45deg, #D97706, #F59E0B)",
+        "badge_border": "#FCD34D",
+        "container_border": "#F59E0B",
+        "container_shadow": "rgba(245, 158, 11, 0.3)",
+        "container_bg": "rgba(30, 27, 25, 0.95)",
+        "box_shadow_color": "rgba(245, 158, 11, 0.3)"
+    },
+    "rare": {
+        "badge": "RARE",
+        "badge_bg": "linear-gradient(45deg, #1D4ED8, #3B82F6)",
+        "badge_border": "#60A5FA",
+        "container_border": "#3B82F6",
+        "container_shadow": "rgba(59, 130, 246, 0.25)",
+        "container_bg": "rgba(10, 20, 40, 0.95)",
+        "box_shadow_color": "rgba(59, 130, 246, 0.3)"
+    },
+    "common": {
+        "badge": "COMMON",
+        "badge_bg": "linear-gradient(45deg, #4B5563, #6B7280)",
+        "badge_border": "#9CA3AF",
+        "container_border": "#6B7280",
+        "container_shadow": "rgba(156, 163, 175, 0.1)",
+        "container_bg": "rgba(40, 40, 40, 0.95)",
+        "box_shadow_color": "rgba(0, 0, 0, 0.2)"
+    },
+    "epic": {
+        "badge": "EPIC",
+        "badge_bg": "linear-gradient(45deg, #6D28D9, #8B5CF6)",
+        "badge_border": "#C084FC",
+        "container_border": "#8B5CF6",
+        "container_shadow": "rgba(147, 51, 234, 0.3)",
+        "container_bg": "rgba(30, 0, 30, 0.95)",
+        "box_shadow_color": "rgba(147, 51, 234, 0.3)"
+    }
+}
+LOW_HP_THRESHOLD = 30  # HP at or below which the "Low HP" filter matches
+SEARCH_GRAM_SIZES = (2, 3)  # Substring lengths indexed for name search
+COLLECTION_SORTS = {"Rarity": "rarity", "Name": "name", "Level": "level", "HP (lowest first)": "hp", "Copies": "count"}
+COLLECTION_FILTERS = ["All", "Fusable only", "Low HP", "Favorites", "Common", "Rare", "Epic", "Legendary"]
+CONFIG_CHECK_INTERVAL = 1.0  # Seconds between config file mtime checks
+IMAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Upper bound for cached base64 image data
+TRACEMALLOC_FRAMES = 10
+RNG_LOG_FILE = "rng_sessions.jsonl"
+RNG_STREAMS = ("gacha", "minigame", "buddy")
+RNG_BLOCK_SIZE = 256  # Variates pre-generated per refill
+# Pity: from the soft-th pull without at least this rarity, its chance rises by
+# step per pull; the hard-th pull is guaranteed to reach it
+PITY_RULES = {
+    "legendary": {"soft": 60, "hard": 90, "step": 0.06},
+    "epic": {"soft": 8, "hard": 10, "step": 0.3},
+}
+PITY_MAX_TABLE_ROWS = 100_000  # One row per combination of counters; larger rule sets fall back to PITY_RULES
+MULTI_PULL_COUNT = 10
+BUDDY_ROTATION_MODES = ("off", "cards", "deck")
+DEFAULT_ROTATION_CARDS = 10
+OVERLAY_IMAGE_SIZE = (500, 750)  # Prepared overlay images, 2x the overlay's CSS size
+ANSWER_LOG_FILE = "answer_log.bin"
+ANSWER_LOG_CAPACITY = 4096      # Answers kept in memory for the session view
+ANSWER_LOG_FLUSH_EVERY = 256    # Answers per binary block written to the log file
+ANSWER_LOG_MAX_BYTES = 1024 * 1024  # Log file size that triggers a rotation
+ANSWER_LOG_BACKUPS = 3
+SESSION_TRAJECTORY_POINTS = 24  # HP samples shown in the session view
+SHOP_ITEMS = [
+    {"name": "Guaranteed Rare Pull", "cost": 200, "description": "Your next pull is guaranteed to be at least Rare.", "action": "rare_pull", "ticket": "rare"},
+    {"name": "Free Pull Ticket", "cost": 150, "description": "Perform an extra free pull.", "action": "free_pull"},
+    {"name": "Night Theme", "cost": 100, "description": "Unlock a new night mode for your addon.", "action": "night_theme"},
+    {"name": "Training Camp", "cost": 300, "description": "Every husbando in your collection gains 50 XP.", "action": "training_camp", "xp": 50}
+]
+# Achievements: unlocked once the progress counter `stat` reaches `target`.
+# `on` lists the events that can change the counter, so only those rules are
+# checked when the event happens.
+ACHIEVEMENTS = [
+    {"id": "first_pull", "name": "First Pull", "on": ["pull"], "stat": "pulls", "target": 1, "reward": 100},
+    {"id": "pulls_100", "name": "Gacha Regular", "on": ["pull"], "stat": "pulls", "target": 100, "reward": 300},
+    {"id": "first_epic", "name": "Epic Find", "on": ["pull", "fusion"], "stat": "epic_obtained", "target": 1, "reward": 150},
+    {"id": "first_legendary", "name": "Living Legend", "on": ["pull", "fusion"], "stat": "legendary_obtained", "target": 1, "reward": 500},
+    {"id": "first_fusion", "name": "Fusion Novice", "on": ["fusion"], "stat": "fusions", "target": 1, "reward": 50},
+    {"id": "fusions_25", "name": "Fusion Master", "on": ["fusion"], "stat": "fusions", "target": 25, "reward": 250},
+    {"id": "answers_1000", "name": "Dedicated Student", "on": ["answer"], "stat": "answers", "target": 1000, "reward": 300},
+    {"id": "answer_streak_50", "name": "Flawless Fifty", "on": ["answer"], "stat": "answer_streak", "target": 50, "reward": 200},
+    {"id": "level_10", "name": "Best Buddies", "on": ["level_up"], "stat": "best_level", "target": 10, "reward": 250},
+    {"id": "login_streak_7", "name": "Weekly Visitor", "on": ["login"], "stat": "best_login_streak", "target": 7, "reward": 150},
+    {"id": "spent_5000", "name": "Big Spender", "on": ["spend"], "stat": "points_spent", "target": 5000, "reward": 250},
+]
+PULL_HISTORY_FILE = "pull_history.bin"
+PULL_HISTORY_SLOTS = 4          # Rarity codes (and pity counters) a history record holds
+RATE_CONFIDENCE_Z = 1.96        # 95% confidence intervals in the drop-rate report
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+IMAGE_PROBE_CACHE_FILE = "image_probe_cache.json"
+IMAGE_PROBE_WORKERS = 8
+IMAGE_MAX_BYTES = 20 * 1024 * 1024  # Larger files are left out of pulls and the reviewer
+IMAGE_MAX_PIXELS = 40_000_000       # e.g. 8000x5000
+OVERLAY_MODES = ("full", "lite")
+LITE_CARD_SIZE = (540, 900)     # Pre-rendered lite overlay cards, 2x their 270x450 CSS size
+LITE_CARD_CACHE_SIZE = 16       # Lite overlay cards kept in memory
+# Level L needs round(base * L ** exponent) XP to reach L + 1 ("levelCurve" in the config)
+LEVEL_CURVE = {"base": 100, "exponent": 1.0, "maxLevel": 200}
+LEVEL_CURVE_MAX_LEVEL = 1000    # Longer curves, or step lists, are cut to this many levels
+LEVEL_CURVE_MAX_EXPONENT = 10.0 # Steeper configured curves fall back to LEVEL_CURVE
+LEVEL_UP_BONUS = 50             # Points per level a buddy gains
@@ -0,0 +1,768 @@
+# -*- coding: utf-8 -*-
+"""
+Game rules of the Husbando Gacha add-on: persistence, gacha pulls, points,
+daily rewards, buddy leveling, fusion, mini-games, and the shop.
+All mutable game state lives in core.state.state and is only changed inside
+its transactions. Nothing in here depends on Qt or aqt; user messages go
+through store.notify.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, date
+from typing import List, Dict, Any, Tuple, Optional
+
+from .achievements import achievement_index, record_progress
+from .analytics import answer_log
+from .config import ConfigSnapshot, compile_config
+from .constants import (
+    ANSWER_LOG_FILE, COLLECTION_FILE, CONFIG_CHECK_INTERVAL, CONFIG_FILE, DEFAULT_PULL_COST,
+    DEFAULT_REWARDS, FUSION_COST, FUSION_ORDER, IMAGE_EXTENSIONS, IMAGE_PROBE_CACHE_FILE,
+    LEVEL_UP_BONUS, LOW_HP_THRESHOLD, LUCKY_ROLL_COST, LUCKY_ROLL_OUTCOMES, MULTI_PULL_COUNT, PULL_HISTORY_FILE, RARITIES, RNG_LOG_FILE,
+)
+from .history import drop_rate_report, pull_history
+from .images import probe_images
+from .index import CollectionIndex
+from .leveling import add_xp, xp_to_next
+from .pity import advance_pity, draw_rarity, is_boosted, pity_counters
+from .rng import init_rng_streams, rng_streams
+from .state import state
+from .store import notify, store
+
+# Configuration globals (the game state itself lives in `state`)
+husbando_folder = ""
+config = {}
+show_during_review = True
+image_problems = {}  # Husbando images left out of pulls and the reviewer, with the reason
+
+# Compiled configuration (hot-reloadable)
+compiled_config = None     # Current ConfigSnapshot
+config_mtime = None        # mtime_ns of the config file the snapshot was built from
+config_checked_at = 0.0    # time.monotonic() of the last mtime check
+
+# -------------------------------
+# Data loading & saving functions
+# -------------------------------
+def get_addon_dir():
+    """Get the addon directory path."""
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def get_config_path() -> str:
+    """Get the path of the addon configuration file."""
+    return os.path.join(get_addon_dir(), CONFIG_FILE)
+
+def get_config_mtime() -> Optional[int]:
+    """Return the config file's mtime in nanoseconds, or None if it doesn't exist."""
+    try:
+        return os.stat(get_config_path()).st_mtime_ns
+    except OSError:
+        return None
+
+def load_addon_data():
+    """Load addon configuration and user collection data."""
+    global config, config_mtime
+
+    config_path = get_config_path()
+    collection_path = os.path.join(get_addon_dir(), COLLECTION_FILE)
+
+    # Load or create config
+    if os.path.exists(config_path):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    else:
+        config = {
+            "pullCost": DEFAULT_PULL_COST,
+            "rewards": DEFAULT_REWARDS,
+            "husbandoFolder": "",
+            "rarities": RARITIES,
+            "showDuringReview": True,
+            "rngMode": "normal",
+            # Additional config options (e.g., theme) can be added here.
+        }
+        save_config()
+
+    # Load or create collection with additional gamification data
+    collection_data = {}
+    if os.path.exists(collection_path):
+        with open(collection_path, 'r', encoding='utf-8') as f:
+            collection_data = json.load(f)
+    with state.transaction():
+        state.collection = collection_data.get("collection", {})
+        state.user_points = collection_data.get("points", 0)
+        state.login_streak = collection_data.get("login_streak", 0)
+        state.last_login_date = collection_data.get("last_login_date", "")
+        state.achievements = collection_data.get("achievements", {})
+        state.inventory = collection_data.get("inventory", {})
+        if not os.path.exists(collection_path):
+            save_collection()
+
+    config_mtime = get_config_mtime()
+    apply_config()
+    collection_index.rebuild(state.collection)
+    answer_log.path = os.path.join(get_addon_dir(), ANSWER_LOG_FILE)
+    pull_history.path = os.path.join(get_addon_dir(), PULL_HISTORY_FILE)
+
+    # Older versions kept a bought Guaranteed Rare Pull as an unused config flag
+    if config.pop("shop_bonus", None) == "rare_pull":
+        with state.transaction():
+            add_pull_ticket("rare")
+            save_collection()
+        save_config()
+
+def save_config():
+    """Save the addon configuration to disk and recompile the snapshot."""
+    global config_mtime
+    with open(get_config_path(), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    # Our own write must not count as an external edit
+    config_mtime = get_config_mtime()
+    apply_config()
+
+def save_collection():
+    """
+    Save the user's husbando collection, points, and gamification data to disk.
+    Inside a transaction the save runs once, after the transaction commits.
+    """
+    state.after_commit(write_collection, once=True)
+
+def write_collection():
+    """Write the committed game state to the collection file."""
+    collection_path = os.path.join(get_addon_dir(), COLLECTION_FILE)
+    # Holding the lock keeps the data consistent and concurrent saves in order
+    with state.lock:
+        collection_data = {
+            "collection": state.collection,
+            "points": state.user_points,
+            "login_streak": state.login_streak,
+            "last_login_date": state.last_login_date,
+            "achievements": state.achievements,
+            "inventory": state.inventory
+        }
+        with open(collection_path, 'w', encoding='utf-8') as f:
+            json.dump(collection_data, f, indent=2)
+
+def load_husbando_images():
+    """
+    Load husbando images from the specified folder.
+    Every candidate's header is probed first; unreadable, damaged, or
+    oversized files are left out and listed in image_problems instead.
+    """
+    global image_problems
+    candidates = []
+    if husbando_folder and os.path.exists(husbando_folder):
+        # Sorted, since listdir order isn't stable and seeded draws pick from this list by index
+        for file in sorted(os.listdir(husbando_folder)):
+            file_path = os.path.join(husbando_folder, file)
+            if os.path.isfile(file_path) and os.path.splitext(file)[1].lower() in IMAGE_EXTENSIONS:
+                candidates.append(file)
+    probes = probe_images(husbando_folder, candidates, os.path.join(get_addon_dir(), IMAGE_PROBE_CACHE_FILE))
+    images = [file for file in candidates if file in probes and "error" not in probes[file]]
+    image_problems = {file: probes[file]["error"] for file in candidates if file in probes and "error" in probes[file]}
+    with state.transaction():
+        state.husbando_images = images
+    if image_problems:
+        notify(f"Skipped {len(image_problems)} unusable husbando image(s): {', '.join(sorted(image_problems))}")
+
+# -------------------------------
+# NEW: Compiled Configuration (hot-reloadable)
+# -------------------------------
+def apply_config():
+    """Compile the raw config and refresh the globals derived from it."""
+    global compiled_config, husbando_folder, show_during_review
+    previous_folder = compiled_config.husbando_folder if compiled_config else None
+    compiled_config = compile_config(config)
+    husbando_folder = compiled_config.husbando_folder
+    show_during_review = compiled_config.show_during_review
+    if husbando_folder != previous_folder:
+        load_husbando_images()
+
+def get_compiled_config() -> ConfigSnapshot:
+    """
+    Return the current config snapshot.
+    The config file's mtime is checked at most once per CONFIG_CHECK_INTERVAL,
+    and the file is reloaded and recompiled when it was edited on disk.
+    """
+    global config, config_mtime, config_checked_at
+    now = time.monotonic()
+    if compiled_config is not None and now - config_checked_at < CONFIG_CHECK_INTERVAL:
+        return compiled_config
+    config_checked_at = now
+    mtime = get_config_mtime()
+    if compiled_config is None or (mtime is not None and mtime != config_mtime):
+        if mtime is not None and compiled_config is not None:
+            try:
+                with open(get_config_path(), 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            except (OSError, ValueError):
+                # Keep the previous snapshot while the file is half-written or invalid
+                return compiled_config
+        config_mtime = mtime
+        apply_config()
+    return compiled_config
+
+def setup_rng():
+    """Initialize the RNG streams according to the config's record/replay mode."""
+    init_rng_streams(
+        config.get("rngMode", "normal"),
+        os.path.join(get_addon_dir(), RNG_LOG_FILE),
+        config.get("rngReplaySession", ""),
+    )
+
+# -------------------------------
+# NEW: Collection Indexes & Search
+# -------------------------------
+collection_index = CollectionIndex()
+
+def on_index_entry_changed(husbando_file: str):
+    """Keep the collection index in sync with changed entries."""
+    if husbando_file in state.collection:
+        collection_index.update(husbando_file, state.collection[husbando_file])
+
+store.subscribe("entry_changed", on_index_entry_changed)
+store.subscribe("entry_removed", collection_index.remove)
+
+def query_collection(search: str = "", filter_name: str = "All", sort: str = "rarity") -> List[str]:
+    """Return the files matching a search text and filter, in the requested order, using the indexes."""
+    allowed = None
+    if filter_name == "Fusable only":
+        allowed = {f for f in collection_index.range("count", low=FUSION_COST)
+                   if get_next_rarity(state.collection[f]["rarity"])}
+    elif filter_name == "Low HP":
+        allowed = set(collection_index.range("hp", high=LOW_HP_THRESHOLD))
+    elif filter_name == "Favorites":
+        allowed = set(collection_index.favorites)
+    elif filter_name != "All":
+        allowed = set(collection_index.by_rarity.get(filter_name.lower(), ()))
+    if search.strip():
+        matches = collection_index.search(search)
+        allowed = matches if allowed is None else allowed & matches
+    ordered = collection_index.ordered(sort, get_compiled_config().rarity_order)
+    if allowed is None:
+        return ordered
+    return [husbando_file for husbando_file in ordered if husbando_file in allowed]
+
+# -------------------------------
+# Existing Gacha & Points Functions
+# -------------------------------
+def get_random_rarity(min_rarity: str = "") -> str:
+    """Select a random rarity from the table for the current pity counters, and advance them."""
+    compiled = get_compiled_config()
+    with state.transaction():
+        pity = state.inventory.setdefault("pity", {})
+        r = rng_streams["gacha"].random()
+        rarity = draw_rarity(compiled.rarity_order, compiled.pity_tables,
+                             pity_counters(pity, compiled.pity_rules), r, min_rarity)
+        advance_pity(pity, compiled.pity_rules, compiled.rarity_order, rarity)
+    return rarity
+
+def get_husbando_by_rarity(rarity: str) -> Optional[str]:
+    """Get a random husbando image filtered by rarity."""
+    images = state.husbando_images
+    if not images:
+        return None
+    return rng_streams["gacha"].choice(images)
+
+def get_random_husbando() -> Optional[Tuple[str, str, str]]:
+    """Get a random husbando from the collection or a placeholder if collection is empty."""
+    snapshot = state.snapshot()
+    if not snapshot.husbando_images:
+        return None
+    usable = [f for f in snapshot.collection if f not in image_problems]
+    if usable:
+        husbando_file = rng_streams["buddy"].choice(usable)
+        rarity = snapshot.collection[husbando_file]["rarity"]
+        return (husbando_file, rarity, os.path.join(husbando_folder, husbando_file))
+    husbando_file = rng_streams["buddy"].choice(snapshot.husbando_images)
+    return (husbando_file, "common", os.path.join(husbando_folder, husbando_file))
+
+def pick_next_buddy() -> Optional[Tuple[str, str, str]]:
+    """Pick the buddy to rotate to next: a random husbando from the collection other than the current one."""
+    snapshot = state.snapshot()
+    current = snapshot.current_husbando
+    candidates = [f for f in snapshot.collection if (not current or f != current[0]) and f not in image_problems]
+    if not candidates:
+        return None
+    husbando_file = rng_streams["buddy"].choice(candidates)
+    return (husbando_file, snapshot.collection[husbando_file]["rarity"], os.path.join(husbando_folder, husbando_file))
+
+def rotate_buddy(husbando_file: str):
+    """Make a collection entry the current buddy as part of a rotation."""
+    with state.transaction():
+        if husbando_file not in state.collection:
+            return
+        state.rotation_answers = 0
+        state.current_husbando = (husbando_file, state.collection[husbando_file]["rarity"],
+                                  os.path.join(husbando_folder, husbando_file))
+        state.emit("buddy_changed", state.current_husbando)
+
+def add_points(amount: int):
+    """Add points to the user's balance."""
+    with state.transaction():
+        state.user_points += amount
+        save_collection()
+        state.emit("points_changed", state.user_points)
+    notify(f"+{amount} points! Total: {state.user_points}")
+
+def set_current_husbando(husbando_file, rarity):
+    """Set a husbando as the current displayed one."""
+    file_path = os.path.join(husbando_folder, husbando_file)
+    if os.path.exists(file_path):
+        with state.transaction():
+            state.current_husbando = (husbando_file, rarity, file_path)
+            state.emit("buddy_changed", state.current_husbando)
+        notify(f"Set {os.path.splitext(husbando_file)[0]} as current husbando!")
+
+# -------------------------------
+# NEW: Daily Rewards & Login Streaks
+# -------------------------------
+def check_daily_reward():
+    """Check daily login and award bonus points for consecutive logins."""
+    today = date.today().isoformat()
+    with state.transaction():
+        if state.last_login_date == today:
+            return
+        if state.last_login_date:
+            last_date = datetime.fromisoformat(state.last_login_date).date()
+            if (date.today() - last_date).days == 1:
+                state.login_streak += 1
+            else:
+                state.login_streak = 1
+        else:
+            state.login_streak = 1
+        state.last_login_date = today
+        base_reward = 50
+        bonus = (state.login_streak - 1) * 10
+        add_points(base_reward + bonus)
+        notify(f"Daily reward: +{base_reward + bonus} points! (Streak: {state.login_streak} days)")
+        check_achievements("login", best={"best_login_streak": state.login_streak})
+        save_collection()
+
+# -------------------------------
+# NEW: Buddy XP & Level (per current husbando)
+# -------------------------------
+def get_xp_progress(data) -> Tuple[int, int, Optional[int]]:
+    """Return (level, XP into the level, XP needed for the next level or None at the top) of an entry."""
+    level = data.get("level", 1)
+    return level, data.get("xp", 0), xp_to_next(get_compiled_config().level_curve, level)
+
+def grant_xp(husbando_file: str, amount: int, announce: bool = True) -> int:
+    """
+    Add XP to a collection entry without saving, resolving any number of
+    level-ups on the level curve at once. Call it inside a transaction.
+    Returns the number of levels gained.
+    """
+    entry = state.entry(husbando_file)
+    level, xp, gained = add_xp(get_compiled_config().level_curve, entry.get("level", 1), entry.get("xp", 0), amount)
+    entry["level"], entry["xp"] = level, xp
+    if gained:
+        if announce:
+            notify(f"{os.path.splitext(husbando_file)[0]} leveled up to Level {level}!")
+        check_achievements("level_up", add={"level_ups": gained}, best={"best_level": level})
+    return gained
+
+def grant_buddy_xp(amount: int) -> int:
+    """
+    Add XP to the current buddy without saving.
+    Returns the bonus points earned by leveling up, so callers can batch them.
+    """
+    with state.transaction():
+        if not state.current_husbando:
+            return 0
+        husbando_file, _, _ = state.current_husbando
+        if husbando_file not in state.collection:
+            return 0
+        return grant_xp(husbando_file, amount) * LEVEL_UP_BONUS
+
+def grant_xp_bulk(grants: Dict[str, int]) -> Dict[str, int]:
+    """
+    Add XP to many husbandos at once, e.g. for an event-wide grant or a
+    backfill of synced reviews. Everything, including the level-up bonus
+    points, is applied in one transaction with a single save.
+    Returns the levels gained per husbando that leveled up.
+    """
+    leveled = {}
+    with state.transaction():
+        for husbando_file, amount in grants.items():
+            if husbando_file not in state.collection or not amount:
+                continue
+            gained = grant_xp(husbando_file, amount, announce=False)
+            if gained:
+                leveled[husbando_file] = gained
+            state.emit("entry_changed", husbando_file)
+        bonus = sum(leveled.values()) * LEVEL_UP_BONUS
+        if bonus:
+            state.user_points += bonus
+            state.emit("points_changed", state.user_points)
+        save_collection()
+    if leveled:
+        notify(f"{len(leveled)} husbando(s) gained {sum(leveled.values())} level(s)! +{bonus} points")
+    return leveled
+
+def add_buddy_xp(amount: int):
+    """Add XP to the current buddy and level up if threshold is reached."""
+    with state.transaction():
+        if not state.current_husbando or state.current_husbando[0] not in state.collection:
+            return
+        bonus = grant_buddy_xp(amount)
+        if bonus:
+            add_points(bonus)
+        save_collection()
+        state.emit("entry_changed", state.current_husbando[0])
+
+# -------------------------------
+# NEW: Achievements & Challenges
+# -------------------------------
+def check_achievements(event: str, add: Optional[Dict[str, int]] = None,
+                       best: Optional[Dict[str, int]] = None, reset: Tuple[str, ...] = ()):
+    """
+    Update the achievement progress for an event and grant the rewards of
+    the achievements it unlocks. See core.achievements.record_progress.
+    """
+    with state.transaction():
+        unlocked = record_progress(state.achievements, achievement_index, event, add, best, reset)
+        for rule in unlocked:
+            add_points(rule["reward"])
+            notify(f"Achievement unlocked: {rule['name']}! +{rule['reward']} points")
+        save_collection()
+
+# -------------------------------
+# NEW: Fusion & Upgrades
+# -------------------------------
+def get_next_rarity(rarity: str) -> Optional[str]:
+    """Return the rarity a fusion upgrades to, or None at the top of the ladder."""
+    if rarity in FUSION_ORDER and FUSION_ORDER.index(rarity) < len(FUSION_ORDER) - 1:
+        return FUSION_ORDER[FUSION_ORDER.index(rarity) + 1]
+    return None
+
+def fuse_husbando(husbando_file: str):
+    """Fuse 3 duplicates of a husbando to upgrade its rarity."""
+    with state.transaction():
+        if husbando_file in state.collection and state.collection[husbando_file]["count"] >= FUSION_COST:
+            entry = state.entry(husbando_file)
+            entry["count"] -= FUSION_COST
+            new_rarity = get_next_rarity(entry["rarity"])
+            if new_rarity:
+                entry["rarity"] = new_rarity
+                notify(f"Fusion successful! {husbando_file} is now {new_rarity.upper()}")
+                check_achievements("fusion", add={"fusions": 1, f"{new_rarity}_obtained": 1})
+            else:
+                notify("Already at highest rarity!")
+            save_collection()
+            state.emit("entry_changed", husbando_file)
+        else:
+            notify("Not enough copies to fuse!")
+
+def auto_fuse_all() -> Dict[Tuple[str, str], int]:
+    """
+    Fuse every eligible husbando in a single pass over the collection.
+    Upgrades cascade (e.g. common -> rare -> epic) while copies allow, favorites
+    and locked husbandos are skipped, and the result is saved once at the end.
+    Returns the number of fusions per (from_rarity, to_rarity) step.
+    """
+    upgrades = {}
+    with state.transaction():
+        for husbando_file, data in list(state.collection.items()):
+            if data.get("favorite") or data.get("locked"):
+                continue
+            if data["count"] < FUSION_COST or not get_next_rarity(data["rarity"]):
+                continue
+            data = state.entry(husbando_file)
+            while data["count"] >= FUSION_COST:
+                new_rarity = get_next_rarity(data["rarity"])
+                if not new_rarity:
+                    break
+                data["count"] -= FUSION_COST
+                step = (data["rarity"], new_rarity)
+                upgrades[step] = upgrades.get(step, 0) + 1
+                data["rarity"] = new_rarity
+            state.emit("entry_changed", husbando_file)
+        if upgrades:
+            obtained = {}
+            for (_, new_rarity), count in upgrades.items():
+                obtained[f"{new_rarity}_obtained"] = obtained.get(f"{new_rarity}_obtained", 0) + count
+            check_achievements("fusion", add={"fusions": sum(upgrades.values()), **obtained})
+            save_collection()
+    return upgrades
+
+def toggle_lock(husbando_file: str) -> bool:
+    """Toggle the fusion lock of a husbando and return the new lock state."""
+    with state.transaction():
+        if husbando_file not in state.collection:
+            return False
+        entry = state.entry(husbando_file)
+        locked = not entry.get("locked", False)
+        entry["locked"] = locked
+        save_collection()
+        state.emit("entry_changed", husbando_file)
+    return locked
+
+# -------------------------------
+# NEW: Gacha Pull (pity & tickets)
+# -------------------------------
+def add_pull_ticket(rarity: str, amount: int = 1):
+    """Give the player guaranteed-minimum-rarity pull tickets (saved with the collection)."""
+    with state.transaction():
+        tickets = state.inventory.setdefault("tickets", {})
+        tickets[rarity] = tickets.get(rarity, 0) + amount
+
+def take_pull_ticket() -> str:
+    """Use up the best pull ticket and return its rarity, or "" if there is none."""
+    rank = get_compiled_config().rarity_rank
+    with state.transaction():
+        tickets = state.inventory.get("tickets", {})
+        owned = [rarity for rarity, count in tickets.items() if count > 0 and rarity in rank]
+        if not owned:
+            return ""
+        best = max(owned, key=lambda rarity: rank[rarity])
+        tickets[best] -= 1
+        if not tickets[best]:
+            del tickets[best]
+    return best
+
+def get_drop_rate_report() -> Dict[str, Any]:
+    """Compare the rarities of all recorded pulls with the configured chances."""
+    if pull_history.path is None:
+        return {"pulls": 0, "base_pulls": 0, "rows": [], "untracked": []}
+    compiled = get_compiled_config()
+    cumulative = (0.0,) + compiled.rarity_cumulative
+    chances = {rarity: cumulative[i + 1] - cumulative[i] for i, rarity in enumerate(compiled.rarity_order)}
+    return drop_rate_report(pull_history.path, chances)
+
+def get_pity_status() -> List[Tuple[str, int, int]]:
+    """Return (rarity, pulls since the last one, guaranteed at) for each pity rule."""
+    compiled = get_compiled_config()
+    counters = pity_counters(state.snapshot().inventory.get("pity", {}), compiled.pity_rules)
+    return [(name, count, hard) for (name, _, hard, _), count in zip(compiled.pity_rules, counters)]
+
+def draw_pull() -> Tuple[str, str]:
+    """
+    Draw one pull into the collection; call it inside a transaction.
+    A pull ticket, if any, is used up; a copy pulled at a higher rarity
+    upgrades the entry. The pull is added to the pull history once the
+    transaction commits. Returns (husbando_file, rarity).
+    """
+    compiled = get_compiled_config()
+    rules = compiled.pity_rules
+    counters = pity_counters(state.inventory.get("pity", {}), rules)
+    pity = {name: count for (name, _, _, _), count in zip(rules, counters)}
+    # Boosted whenever pity changes the odds of this pull, guaranteed pulls included
+    pity_boosted = is_boosted(compiled.pity_tables[counters], compiled.rarity_cumulative)
+    ticket = take_pull_ticket()
+    if ticket:
+        notify(f"{ticket.capitalize()} ticket used: this pull is at least {ticket.upper()}!")
+    rarity = get_random_rarity(ticket)
+    husbando_file = get_husbando_by_rarity(rarity)
+    # If new, initialize xp and level for this husbando
+    if husbando_file not in state.collection:
+        entry = state.add_entry(husbando_file, {
+            "count": 0,
+            "rarity": rarity,
+            "favorite": False,
+            "xp": 0,
+            "level": 1,
+            "hp": 100  # initialize HP at 100
+        })
+    else:
+        entry = state.entry(husbando_file)
+        rank = get_compiled_config().rarity_rank
+        if rank.get(rarity, 0) > rank.get(entry["rarity"], 0):
+            entry["rarity"] = rarity
+    entry["count"] += 1
+    check_achievements("pull", add={"pulls": 1, f"{rarity}_obtained": 1})
+    state.after_commit(pull_history.append, husbando_file, rarity, pity, pity_boosted, bool(ticket))
+    return husbando_file, rarity
+
+def pull_husbando() -> Optional[Tuple[str, str, str]]:
+    """Pull a random husbando card."""
+    pull_cost = get_compiled_config().pull_cost
+    with state.transaction():
+        if state.user_points < pull_cost:
+            notify(f"Not enough points! You need {pull_cost} points.")
+            return None
+        if not state.husbando_images:
+            notify("No husbando images found!")
+            return None
+        state.user_points -= pull_cost
+        husbando_file, rarity = draw_pull()
+        save_collection()
+        state.emit("points_changed", state.user_points)
+        state.emit("entry_changed", husbando_file)
+        state.current_husbando = (husbando_file, rarity, os.path.join(husbando_folder, husbando_file))
+        state.emit("buddy_changed", state.current_husbando)
+        # Award XP for pulling (to the current buddy)
+        add_buddy_xp(5)
+        check_achievements("spend", add={"points_spent": pull_cost})
+        result = state.current_husbando
+    # Stub for events (if active)
+    if get_active_event():
+        notify(f"Event bonus active: Enjoy the {get_active_event()}!")
+    return result
+
+def pull_husbandos(n: int = MULTI_PULL_COUNT) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    Pull n husbandos as a single transaction: one cost deduction, one save,
+    and one event per changed entry. The rarest pull becomes the current buddy.
+    """
+    cost = n * get_compiled_config().pull_cost
+    with state.transaction():
+        if n < 1 or state.user_points < cost:
+            notify(f"Not enough points! You need {cost} points.")
+            return None
+        if not state.husbando_images:
+            notify("No husbando images found!")
+            return None
+        state.user_points -= cost
+        results = []
+        for _ in range(n):
+            husbando_file, rarity = draw_pull()
+            results.append((husbando_file, rarity, os.path.join(husbando_folder, husbando_file)))
+        rank = get_compiled_config().rarity_rank
+        state.current_husbando = max(results, key=lambda result: rank[result[1]])
+        # Same XP as n single pulls, granted at once
+        state.user_points += grant_buddy_xp(5 * n)
+        save_collection()
+        state.emit("points_changed", state.user_points)
+        for husbando_file in dict.fromkeys(result[0] for result in results):
+            state.emit("entry_changed", husbando_file)
+        state.emit("buddy_changed", state.current_husbando)
+        check_achievements("spend", add={"points_spent": cost})
+    return results
+
+# -------------------------------
+# NEW: Limited Time Events (Stub)
+# -------------------------------
+def get_active_event():
+    """Return the name of an active event if any."""
+    today = date.today()
+    # Example event: Holiday Event from Dec 20 to Dec 31
+    event_start = date(today.year, 12, 20)
+    event_end = date(today.year, 12, 31)
+    if event_start <= today <= event_end:
+        return "Holiday Event"
+    return None
+
+# -------------------------------
+# NEW: Lucky Rolls & Mini-Games
+# -------------------------------
+def roll_lucky_outcomes(n: int) -> Dict[str, int]:
+    """Draw n Lucky Roll outcomes in one batch and count how often each came up."""
+    tally = {outcome: 0 for outcome, _ in LUCKY_ROLL_OUTCOMES}
+    slots = len(LUCKY_ROLL_OUTCOMES)
+    for r in rng_streams["minigame"].randoms(n):
+        tally[LUCKY_ROLL_OUTCOMES[int(r * slots)][0]] += 1
+    return tally
+
+def play_lucky_rolls(n: int) -> Optional[Dict[str, Any]]:
+    """
+    Play n Lucky Rolls as a single transaction.
+    The total cost, net points, and buddy XP are applied together and saved once.
+    Returns a summary, or None if the player can't afford the rolls.
+    """
+    cost = n * LUCKY_ROLL_COST
+    with state.transaction():
+        if n < 1 or state.user_points < cost:
+            return None
+        tally = roll_lucky_outcomes(n)
+        rewards = dict(LUCKY_ROLL_OUTCOMES)
+        points_won = sum(count * rewards[outcome] for outcome, count in tally.items() if outcome != "Bonus XP")
+        xp_won = tally["Bonus XP"] * rewards["Bonus XP"]
+        level_bonus = grant_buddy_xp(xp_won) if xp_won else 0
+        state.user_points += points_won + level_bonus - cost
+        check_achievements("spend", add={"points_spent": cost})
+        save_collection()
+        state.emit("points_changed", state.user_points)
+        if xp_won and state.current_husbando and state.current_husbando[0] in state.collection:
+            state.emit("entry_changed", state.current_husbando[0])
+    return {
+        "rolls": n,
+        "cost": cost,
+        "tally": tally,
+        "points": points_won + level_bonus,
+        "xp": xp_won,
+    }
+
+# -------------------------------
+# NEW: Shop & In-Game Currency
+# -------------------------------
+def shop_buy_action(item):
+    """Perform the purchase for a shop item."""
+    with state.transaction():
+        if state.user_points < item["cost"]:
+            notify("Not enough points!")
+            return
+        state.user_points -= item["cost"]
+        check_achievements("spend", add={"points_spent": item["cost"]})
+        if item["action"] == "rare_pull":
+            add_pull_ticket(item["ticket"])  # used up by the next pull
+            notify("Guaranteed Rare Pull activated for your next pull!")
+        elif item["action"] == "free_pull":
+            add_points(get_compiled_config().pull_cost)  # refund pull cost
+            notify("Free Pull activated!")
+        elif item["action"] == "night_theme":
+            config["theme"] = "night"
+            notify("Night Theme unlocked! (Apply in settings)")
+        elif item["action"] == "training_camp":
+            # Event-wide grant: one pass over the collection, one commit
+            grant_xp_bulk({husbando_file: item["xp"] for husbando_file in state.collection})
+            notify(f"Training Camp: every husbando gained {item['xp']} XP!")
+        save_collection()
+        state.emit("points_changed", state.user_points)
+
+# -------------------------------
+# Review Answers
+# -------------------------------
+def apply_answer(ease: int):
+    """
+    New reward scheme based on answer ease:
+    - Again (1):    -5 HP,   0 XP,  0 points
+    - Hard (2):     -2 HP,  +2 XP, +2 points
+    - Good (3):    +1 HP,  +5 XP, +5 points
+    - Easy (4):   +10 HP, +10 XP, +10 points
+    """
+    reward_scheme = get_compiled_config().answer_rewards
+
+    reward = reward_scheme.get(ease, {"hp": 0, "xp": 0, "points": 0})
+    hp_delta, xp_delta, hp_after = 0, 0, -1
+
+    with state.transaction():
+        state.rotation_answers += 1
+
+        # Update current husbando's stats if available
+        if state.current_husbando:
+            husbando_file, _, _ = state.current_husbando
+            if husbando_file in state.collection:
+                husbando = state.entry(husbando_file)
+                # Update HP and cap between 0 and 100
+                current_hp = husbando.get("hp", 0)
+                new_hp = current_hp + reward["hp"]
+                husbando["hp"] = max(0, min(new_hp, 100))  # Ensure HP stays between 0-100
+                hp_delta, hp_after = husbando["hp"] - current_hp, husbando["hp"]
+
+                # Check if husbando's HP has reached 0
+                if husbando["hp"] == 0:
+                    state.remove_entry(husbando_file)
+                    notify(f"{os.path.splitext(husbando_file)[0]} has died and has been removed from your collection.")
+                    state.current_husbando = None  # Clear current husbando if it dies
+                    state.emit("entry_removed", husbando_file)
+                    state.emit("buddy_changed", state.current_husbando)
+                else:
+                    # Update XP
+                    xp_delta = reward["xp"]
+                    gained = grant_xp(husbando_file, xp_delta)
+                    if gained:
+                        add_points(gained * LEVEL_UP_BONUS)  # bonus points for leveling up
+
+                    notify(f"{os.path.splitext(husbando_file)[0]} stats: HP {husbando['hp']}, XP {husbando['xp']}")
+
+                save_collection()
+                if husbando_file in state.collection:
+                    state.emit("entry_changed", husbando_file)
+
+        answer_log.append(ease, reward["points"], hp_delta, xp_delta, hp_after)
+        if ease > 1:
+            check_achievements("answer", add={"answers": 1, "answer_streak": 1})
+        else:
+            check_achievements("answer", add={"answers": 1}, reset=("answer_streak",))
+        # Award user points (gacha currency)
+        add_points(reward["points"])
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Pull history: an append-only file of fixed-width pull records, read back
+through mmap, and the observed-vs-configured drop-rate report built on it.
+"""
+
+import math
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional
+
+from .constants import FUSION_ORDER, PULL_HISTORY_SLOTS, RATE_CONFIDENCE_Z
+
+HISTORY_MAGIC = b"HGPH"
+HISTORY_HEADER = struct.Struct("<4sHH")  # magic, format version, record size
+HISTORY_VERSION = 1
+# time, image id, rarity byte, one pity counter per rarity code
+HISTORY_RECORD = struct.Struct(f"<dIB{PULL_HISTORY_SLOTS}H")
+RARITY_OFFSET = struct.calcsize("<dI")  # Offset of the rarity byte within a record
+# Rarity byte: the low bits are the rarity code (index in FUSION_ORDER), the
+# high bits flag pulls whose odds were not the configured base rates
+RARITY_MASK = 0x3F
+FLAG_PITY = 0x40    # Pity changed the odds: the pity table row differed from the base rates
+FLAG_TICKET = 0x80  # A pull ticket guaranteed a minimum rarity
+UNKNOWN_RARITY = RARITY_MASK
+FLAGGED_BYTES = bytes(range(RARITY_MASK + 1, 256))
+
+
+class PullRecord(NamedTuple):
+    """One decoded pull of the history."""
+    time: float
+    husbando_file: str
+    rarity: str
+    pity_boosted: bool
+    ticket: bool
+    pity: Dict[str, int]
+
+def rarity_code(rarity: str) -> int:
+    """Return the code stored for a rarity."""
+    return FUSION_ORDER.index(rarity) if rarity in FUSION_ORDER[:PULL_HISTORY_SLOTS] else UNKNOWN_RARITY
+
+def rarity_name(code: int) -> str:
+    """Return the rarity for a stored code."""
+    return FUSION_ORDER[code] if code < min(len(FUSION_ORDER), PULL_HISTORY_SLOTS) else "unknown"
+
+
+class PullHistory:
+    """
+    Append-only pull log. Each pull is one HISTORY_RECORD; image file names
+    are stored once in a name table next to the log (path + ".names", one per
+    line) and records refer to them by line number.
+    """
+
+    def __init__(self):
+        self.path = None     # Log file; nothing is recorded while None
+        self.names = None    # Name table, loaded on the first append
+        self.ids = {}
+
+    def load_names(self):
+        """Read the name table from disk."""
+        self.names = read_name_table(self.path)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def name_id(self, husbando_file: str) -> int:
+        """Return the id of a file name, adding it to the name table if it is new."""
+        if husbando_file not in self.ids:
+            with open(self.path + ".names", "a", encoding="utf-8") as f:
+                f.write(husbando_file + "\n")
+            self.ids[husbando_file] = len(self.names)
+            self.names.append(husbando_file)
+        return self.ids[husbando_file]
+
+    def append(self, husbando_file: str, rarity: str, pity: Mapping[str, int], pity_boosted: bool, ticket: bool):
+        """Record one pull; pity holds the counters the pull was drawn with."""
+        if self.path is None:
+            return
+        try:
+            if self.names is None:
+                self.load_names()
+            code = rarity_code(rarity)
+            if pity_boosted:
+                code |= FLAG_PITY
+            if ticket:
+                code |= FLAG_TICKET
+            counters = [0] * PULL_HISTORY_SLOTS
+            for name, count in pity.items():
+                slot = rarity_code(name)
+                if slot != UNKNOWN_RARITY:
+                    counters[slot] = min(count, 0xFFFF)
+            record = HISTORY_RECORD.pack(time.time(), self.name_id(husbando_file), code, *counters)
+            with open(self.path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(HISTORY_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION, HISTORY_RECORD.size))
+                f.write(record)
+        except OSError:
+            # Like the answer log, the history must never get in the way of pulling
+            pass
+
+def read_name_table(path: str) -> List[str]:
+    """Read the name table of a pull history file."""
+    if not os.path.exists(path + ".names"):
+        return []
+    with open(path + ".names", "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+@contextmanager
+def map_pull_history(path: str) -> Iterator[Optional[mmap.mmap]]:
+    """Map a pull history file read-only; yields None if it is missing, empty, or of another format."""
+    if not os.path.exists(path) or os.path.getsize(path) < HISTORY_HEADER.size:
+        yield None
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, version, record_size = HISTORY_HEADER.unpack_from(mapped, 0)
+        if magic != HISTORY_MAGIC or version != HISTORY_VERSION or record_size != HISTORY_RECORD.size:
+            yield None
+        else:
+            yield mapped
+
+def record_count(mapped: mmap.mmap) -> int:
+    """Number of complete records; a record cut short by a crash is ignored."""
+    return (len(mapped) - HISTORY_HEADER.size) // HISTORY_RECORD.size
+
+def iter_pull_history(path: str) -> Iterator[PullRecord]:
+    """Yield the recorded pulls, oldest first."""
+    names = read_name_table(path)
+    with map_pull_history(path) as mapped:
+        if mapped is None:
+            return
+        end = HISTORY_HEADER.size + record_count(mapped) * HISTORY_RECORD.size
+        for timestamp, name_id, code, *counters in HISTORY_RECORD.iter_unpack(mapped[HISTORY_HEADER.size:end]):
+            yield PullRecord(
+                time=timestamp,
+                husbando_file=names[name_id] if name_id < len(names) else "",
+                rarity=rarity_name(code & RARITY_MASK),
+                pity_boosted=bool(code & FLAG_PITY),
+                ticket=bool(code & FLAG_TICKET),
+                pity={rarity_name(slot): count for slot, count in enumerate(counters) if count},
+            )
+
+def wilson_interval(hits: int, total: int, z: float = RATE_CONFIDENCE_Z) -> Optional[tuple]:
+    """Wilson score interval for a binomial proportion, or None without trials."""
+    if not total:
+        return None
+    p = hits / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    half = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return (max(0.0, center - half), min(1.0, center + half))
+
+def drop_rate_report(path: str, chances: Mapping[str, float]) -> Dict[str, Any]:
+    """
+    Compare observed rarity frequencies with the configured chances.
+    Only base-rate pulls (no pity boost, no ticket) are compared, since the
+    others were drawn with different odds on purpose. Rarities without a
+    code (not in FUSION_ORDER) are all stored as UNKNOWN_RARITY, so they are
+    listed under "untracked" instead of getting a row. The rarity bytes of all
+    records are pulled out with one strided slice of the mapped file and
+    counted with bytes methods, so no record is unpacked.
+    """
+    report = {"pulls": 0, "base_pulls": 0, "rows": [], "untracked": []}
+    with map_pull_history(path) as mapped:
+        if mapped is None:
+            return report
+        count = record_count(mapped)
+        start = HISTORY_HEADER.size + RARITY_OFFSET
+        rarities = mapped[start:start + count * HISTORY_RECORD.size:HISTORY_RECORD.size]
+    # Dropping every byte with a flag bit set leaves the base-rate pulls
+    base = rarities.translate(None, FLAGGED_BYTES)
+    base_pulls = len(base)
+    report["pulls"] = len(rarities)
+    report["base_pulls"] = base_pulls
+    for name, chance in chances.items():
+        code = rarity_code(name)
+        if code == UNKNOWN_RARITY:
+            report["untracked"].append(name)
+            continue
+        hits = base.count(bytes((code,)))
+        interval = wilson_interval(hits, base_pulls)
+        report["rows"].append({
+            "rarity": name,
+            "configured": chance,
+            "hits": hits,
+            "observed": hits / base_pulls if base_pulls else None,
+            "interval": interval,
+            "consistent": interval is None or interval[0] <= chance <= interval[1],
+        })
+    return report
+
+pull_history = PullHistory()
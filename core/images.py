@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Header-only image probing: format, dimensions, and basic validity of the
+husbando images, read from the first bytes of each file without decoding
+it, probed in parallel and cached by file size and mtime.
+"""
+
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from .constants import IMAGE_MAX_BYTES, IMAGE_MAX_PIXELS, IMAGE_PROBE_WORKERS
+
+PROBE_BYTES = 64 * 1024  # JPEG headers (EXIF, thumbnails) usually end well before this
+PROBE_VERSION = 2        # Bump when probe results change, to invalidate cached entries
+# JPEG start-of-frame markers; C4, C8, and CC share the range but aren't frames
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def probe_png(head: bytes, tail: bytes) -> Dict[str, Any]:
+    """Read the dimensions from IHDR and look for the IEND trailer."""
+    if head[12:16] != b"IHDR" or len(head) < 24:
+        return {"error": "PNG header is damaged"}
+    width, height = struct.unpack(">II", head[16:24])
+    if b"IEND" not in tail:
+        return {"width": width, "height": height, "warning": "PNG trailer not found; the file may be truncated"}
+    return {"width": width, "height": height}
+
+def probe_gif(head: bytes, tail: bytes) -> Dict[str, Any]:
+    """Read the logical screen size."""
+    if len(head) < 10:
+        return {"error": "GIF header is damaged"}
+    width, height = struct.unpack("<HH", head[6:10])
+    return {"width": width, "height": height}
+
+def probe_webp(head: bytes, tail: bytes) -> Dict[str, Any]:
+    """Read the dimensions from the VP8, VP8L, or VP8X chunk."""
+    chunk = head[12:16]
+    if chunk == b"VP8 " and len(head) >= 30 and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return {"width": width & 0x3FFF, "height": height & 0x3FFF}
+    if chunk == b"VP8L" and len(head) >= 25 and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], "little")
+        return {"width": (bits & 0x3FFF) + 1, "height": ((bits >> 14) & 0x3FFF) + 1}
+    if chunk == b"VP8X" and len(head) >= 30:
+        return {"width": int.from_bytes(head[24:27], "little") + 1, "height": int.from_bytes(head[27:30], "little") + 1}
+    return {"error": "WebP header is damaged"}
+
+def probe_jpeg(head: bytes, tail: bytes) -> Dict[str, Any]:
+    """Walk the JPEG segments up to the start-of-frame marker, which holds the dimensions."""
+    offset = 2
+    while offset + 4 <= len(head):
+        if head[offset] != 0xFF:
+            return {"error": "JPEG header is damaged"}
+        marker = head[offset + 1]
+        if marker == 0xFF:  # Fill byte
+            offset += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            if offset + 9 > len(head):
+                break
+            height, width = struct.unpack(">HH", head[offset + 5:offset + 9])
+            if b"\xff\xd9" not in tail:
+                return {"width": width, "height": height, "warning": "JPEG trailer not found; the file may be truncated"}
+            return {"width": width, "height": height}
+        offset += 2 + struct.unpack(">H", head[offset + 2:offset + 4])[0]
+    return {"error": "JPEG dimensions not found in the first 64 KB"}
+
+# Signature, format, and probe function, checked in order
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png", probe_png),
+    (b"\xff\xd8", "jpeg", probe_jpeg),
+    (b"GIF87a", "gif", probe_gif),
+    (b"GIF89a", "gif", probe_gif),
+)
+
+def probe_image(path: str) -> Dict[str, Any]:
+    """
+    Read an image's header and trailer and return its format, width, height,
+    and an "error" message if it is unusable. A missing trailer is only a
+    "warning", since valid files often carry data after it. The format is
+    taken from the file contents, not the extension.
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(PROBE_BYTES)
+            f.seek(max(0, size - 32))
+            tail = f.read(32)
+    except OSError as e:
+        return {"format": None, "error": f"Can't read file: {e.strerror}"}
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        info, image_format = probe_webp(head, tail), "webp"
+    else:
+        for signature, image_format, probe in IMAGE_SIGNATURES:
+            if head.startswith(signature):
+                info = probe(head, tail)
+                break
+        else:
+            return {"format": None, "error": "Not a PNG, JPEG, GIF, or WebP image"}
+    info["format"] = image_format
+    if "error" not in info:
+        if not info["width"] or not info["height"]:
+            info["error"] = "Image has no pixels"
+        elif info["width"] * info["height"] > IMAGE_MAX_PIXELS:
+            info["error"] = f"Image is too large ({info['width']}x{info['height']})"
+        elif size > IMAGE_MAX_BYTES:
+            info["error"] = f"File is too large ({size // (1024 * 1024)} MB)"
+    return info
+
+def load_probe_cache(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read the probe cache; a missing, damaged, or outdated cache is simply empty."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != PROBE_VERSION:
+        return {}
+    return cache.get("images", {})
+
+def probe_images(folder: str, files: Iterable[str], cache_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Probe the files of a folder and return their probe results by file name.
+    Results are reused from the cache while a file's size and mtime are
+    unchanged; the remaining files are probed on a thread pool, and the cache
+    is rewritten if anything was probed.
+    """
+    cache = load_probe_cache(cache_path) if cache_path else {}
+    results, stale = {}, {}
+    for file in files:
+        path = os.path.join(folder, file)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        key = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        cached = cache.get(file)
+        if cached and all(cached.get(name) == value for name, value in key.items()):
+            results[file] = cached
+        else:
+            stale[file] = key
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(IMAGE_PROBE_WORKERS, len(stale))) as executor:
+            for (file, key), info in zip(stale.items(), executor.map(probe_image, (key["path"] for key in stale.values()))):
+                results[file] = {**key, **info}
+    if cache_path and (stale or len(results) != len(cache)):
+        try:
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"version": PROBE_VERSION, "images": results}, f)
+        except OSError:
+            pass
+    return results
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Incrementally maintained secondary indexes and name search over the collection.
+"""
+
+import bisect
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .constants import SEARCH_GRAM_SIZES
+
+
+class CollectionIndex:
+    """
+    Secondary indexes over collection entries, kept up to date incrementally
+    from store events so the collection view never has to rescan the dict.
+    - by_rarity: rarity -> set of files
+    - favorites: set of favorite files
+    - by_field: "level" / "hp" / "count" -> sorted list of (value, file)
+    - names: sorted list of (lowercase name, file) for prefix search
+    - grams: name substring -> set of files for substring search
+    """
+
+    SORTED_FIELDS = ("level", "hp", "count")
+    KEY_FIELDS = ("rarity", "favorite", "level", "hp", "count", "name")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop all indexed entries."""
+        self.by_rarity = {}
+        self.favorites = set()
+        self.by_field = {field: [] for field in self.SORTED_FIELDS}
+        self.names = []
+        self.grams = {}
+        self._keys = {}   # file -> indexed key tuple (see KEY_FIELDS)
+
+    def rebuild(self, entries: Dict[str, Dict[str, Any]]):
+        """Index a whole collection from scratch."""
+        self.clear()
+        for husbando_file, data in entries.items():
+            self.update(husbando_file, data)
+
+    def update(self, husbando_file: str, data: Dict[str, Any]):
+        """Add or re-index one entry, touching only the indexes whose value changed."""
+        key = (
+            data["rarity"],
+            bool(data.get("favorite")),
+            data.get("level", 1),
+            data.get("hp", 100),
+            data["count"],
+            os.path.splitext(husbando_file)[0].lower(),
+        )
+        old = self._keys.get(husbando_file)
+        if old == key:
+            return
+        self._keys[husbando_file] = key
+        for pos, field in enumerate(self.KEY_FIELDS):
+            if old is not None:
+                if old[pos] == key[pos]:
+                    continue
+                self._unpost(field, husbando_file, old[pos])
+            self._post(field, husbando_file, key[pos])
+
+    def remove(self, husbando_file: str):
+        """Remove an entry from all indexes."""
+        old = self._keys.pop(husbando_file, None)
+        if old is None:
+            return
+        for pos, field in enumerate(self.KEY_FIELDS):
+            self._unpost(field, husbando_file, old[pos])
+
+    def key(self, husbando_file: str) -> Optional[Tuple]:
+        """Return the indexed key tuple of an entry (see KEY_FIELDS), or None if it isn't indexed."""
+        return self._keys.get(husbando_file)
+
+    def _post(self, field: str, husbando_file: str, value):
+        if field == "rarity":
+            self.by_rarity.setdefault(value, set()).add(husbando_file)
+        elif field == "favorite":
+            if value:
+                self.favorites.add(husbando_file)
+        elif field == "name":
+            bisect.insort(self.names, (value, husbando_file))
+            for gram in self._name_grams(value):
+                self.grams.setdefault(gram, set()).add(husbando_file)
+        else:
+            bisect.insort(self.by_field[field], (value, husbando_file))
+
+    def _unpost(self, field: str, husbando_file: str, value):
+        if field == "rarity":
+            self.by_rarity.get(value, set()).discard(husbando_file)
+        elif field == "favorite":
+            self.favorites.discard(husbando_file)
+        elif field == "name":
+            self._remove_sorted(self.names, (value, husbando_file))
+            for gram in self._name_grams(value):
+                self.grams.get(gram, set()).discard(husbando_file)
+        else:
+            self._remove_sorted(self.by_field[field], (value, husbando_file))
+
+    @staticmethod
+    def _remove_sorted(items: list, item):
+        i = bisect.bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
+
+    @staticmethod
+    def _name_grams(name: str) -> set:
+        return {name[i:i + size] for size in SEARCH_GRAM_SIZES for i in range(len(name) - size + 1)}
+
+    def range(self, field: str, low: Optional[int] = None, high: Optional[int] = None) -> List[str]:
+        """Return files whose field value lies within [low, high], in ascending order."""
+        items = self.by_field[field]
+        start = 0 if low is None else bisect.bisect_left(items, (low, ""))
+        end = len(items) if high is None else bisect.bisect_left(items, (high + 1, ""))
+        return [husbando_file for _, husbando_file in items[start:end]]
+
+    def prefix(self, text: str) -> List[str]:
+        """Return files whose name starts with text, in name order."""
+        text = text.lower()
+        start = bisect.bisect_left(self.names, (text, ""))
+        matches = []
+        for name, husbando_file in self.names[start:]:
+            if not name.startswith(text):
+                break
+            matches.append(husbando_file)
+        return matches
+
+    def search(self, text: str) -> set:
+        """Return files whose name contains text (single characters match as a prefix)."""
+        text = text.strip().lower()
+        if len(text) < SEARCH_GRAM_SIZES[0]:
+            return set(self.prefix(text))
+        if len(text) in SEARCH_GRAM_SIZES:
+            return set(self.grams.get(text, ()))
+        # Longer queries: intersect the postings of their longest grams, then verify
+        size = SEARCH_GRAM_SIZES[-1]
+        candidates = None
+        for i in range(len(text) - size + 1):
+            postings = self.grams.get(text[i:i + size], set())
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+        return {husbando_file for husbando_file in candidates if text in self._keys[husbando_file][5]}
+
+    def ordered(self, sort: str, rarity_order: Tuple[str, ...]) -> List[str]:
+        """Return all files in the given sort order ("rarity", "name", "level", "hp", "count")."""
+        if sort == "name":
+            return [husbando_file for _, husbando_file in self.names]
+        if sort == "rarity":
+            # Bucket the name-ordered list by rarity, so no comparison sort is needed
+            buckets = {rarity: [] for rarity in rarity_order}
+            unknown = []
+            for _, husbando_file in self.names:
+                buckets.get(self._keys[husbando_file][0], unknown).append(husbando_file)
+            return [f for rarity in rarity_order for f in buckets[rarity]] + unknown
+        files = [husbando_file for _, husbando_file in self.by_field[sort]]
+        # Highest level / most copies first, lowest HP first
+        return files if sort == "hp" else files[::-1]
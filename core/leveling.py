@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Buddy level curve: a precomputed cumulative-XP table and the binary-search
+lookups that turn any XP grant into levels gained.
+"""
+
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+
+from .constants import LEVEL_CURVE, LEVEL_CURVE_MAX_EXPONENT, LEVEL_CURVE_MAX_LEVEL
+
+
+def curve_steps(curve: Dict[str, float]) -> List[int]:
+    """XP needed for each level-up of a {"base", "exponent", "maxLevel"} curve."""
+    max_level = min(max(2, int(curve["maxLevel"])), LEVEL_CURVE_MAX_LEVEL)
+    return [max(1, round(curve["base"] * level ** curve["exponent"])) for level in range(1, max_level)]
+
+def compile_level_curve(raw: Any) -> Tuple[int, ...]:
+    """
+    Build the cumulative-XP table from the "levelCurve" config: either a list
+    of XP requirements per level, or {"base", "exponent", "maxLevel"} where
+    level L needs round(base * L ** exponent) XP to reach L + 1.
+    Entry i is the total XP needed to reach level i + 1, so entry 0 is 0.
+    Curves are cut to LEVEL_CURVE_MAX_LEVEL levels; an exponent above
+    LEVEL_CURVE_MAX_EXPONENT, or a formula that overflows, uses LEVEL_CURVE.
+    """
+    if isinstance(raw, list) and raw and all(isinstance(step, int) and step > 0 for step in raw):
+        steps = raw[:LEVEL_CURVE_MAX_LEVEL - 1]
+    else:
+        curve = dict(LEVEL_CURVE)
+        if isinstance(raw, dict):
+            curve.update({key: value for key, value in raw.items()
+                          if key in LEVEL_CURVE and isinstance(value, (int, float)) and 0 < value < float("inf")})
+        if curve["exponent"] > LEVEL_CURVE_MAX_EXPONENT:
+            curve = dict(LEVEL_CURVE)
+        try:
+            steps = curve_steps(curve)
+        except OverflowError:
+            steps = curve_steps(LEVEL_CURVE)
+    table = [0]
+    for step in steps:
+        table.append(table[-1] + step)
+    return tuple(table)
+
+def xp_to_next(table: Tuple[int, ...], level: int) -> Optional[int]:
+    """XP needed to go from level to level + 1, or None at the highest level."""
+    if level >= len(table):
+        return None
+    return table[level] - table[level - 1]
+
+def resolve_level(table: Tuple[int, ...], total_xp: int) -> Tuple[int, int]:
+    """Return (level, XP into that level) for a buddy's total XP."""
+    level = bisect.bisect_right(table, total_xp)
+    return level, total_xp - table[level - 1]
+
+def add_xp(table: Tuple[int, ...], level: int, xp: int, amount: int) -> Tuple[int, int, int]:
+    """
+    Add XP to a buddy at (level, xp into the level), resolving any number of
+    level-ups in one lookup. Returns (new level, new xp, levels gained).
+    A level above the top of the curve (after maxLevel was lowered) is kept.
+    """
+    level = max(level, 1)
+    if level > len(table):
+        return level, max(xp + amount, 0), 0
+    # XP is never taken away below the start of the current level
+    new_level, new_xp = resolve_level(table, table[level - 1] + max(xp + amount, 0))
+    return new_level, new_xp, new_level - level
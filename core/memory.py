@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Memory accounting for the Husbando Gacha add-on: the base64 image cache,
+pixmaps held by open dialogs, and tracemalloc snapshot diffs.
+"""
+
+import base64
+import os
+import sys
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from . import game
+from .constants import ADDON_NAME, IMAGE_CACHE_MAX_BYTES, LITE_CARD_CACHE_SIZE, TRACEMALLOC_FRAMES
+
+image_cache = OrderedDict()   # (path, size, mtime_ns) -> base64 data URI, in LRU order
+image_cache_bytes = 0
+# Lite overlay cards: (file, rarity) -> {"key": (path, size, mtime_ns), "src": data URI}, in
+# LRU order. Only the main thread reads or writes it; workers just hand back rendered cards.
+lite_card_cache = OrderedDict()
+lite_card_cache_bytes = 0
+pixmap_sources = {}           # id(dialog) -> callable returning the pixmaps the dialog keeps alive
+memory_snapshot = None        # Last tracemalloc snapshot, the baseline for the next diff
+import_times = {}             # module -> seconds its first import took
+
+def encode_image_to_base64(file_path):
+    """
+    Convert an image file to a Base64 string for embedding in HTML.
+    Results are kept in a size-bounded LRU cache keyed by path, size, and mtime.
+    """
+    global image_cache_bytes
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return ""
+    key = (file_path, stat.st_size, stat.st_mtime_ns)
+    if key in image_cache:
+        image_cache.move_to_end(key)
+        return image_cache[key]
+    with open(file_path, "rb") as img_file:
+        data = f"data:image/png;base64,{base64.b64encode(img_file.read()).decode('utf-8')}"
+    image_cache[key] = data
+    image_cache_bytes += sys.getsizeof(data)
+    while image_cache_bytes > IMAGE_CACHE_MAX_BYTES and len(image_cache) > 1:
+        _, evicted = image_cache.popitem(last=False)
+        image_cache_bytes -= sys.getsizeof(evicted)
+    return data
+
+def get_lite_card_key(file_path: str) -> Optional[Tuple[str, int, int]]:
+    """Return the cache key of an image file's lite card, or None if the file is gone."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (file_path, stat.st_size, stat.st_mtime_ns)
+
+def get_cached_lite_card(husbando_file: str, rarity: str, key) -> str:
+    """Return a cached lite card if it was rendered from the same image file, else ""."""
+    cached = lite_card_cache.get((husbando_file, rarity))
+    if not cached or cached["key"] != key:
+        return ""
+    lite_card_cache.move_to_end((husbando_file, rarity))
+    return cached["src"]
+
+def store_lite_card(husbando_file: str, rarity: str, key, src: str):
+    """
+    Cache a rendered lite card. Cards of the same husbando at another rarity
+    are outdated and dropped; the least recently used cards are evicted
+    beyond LITE_CARD_CACHE_SIZE.
+    """
+    global lite_card_cache_bytes
+    for stale in [k for k in lite_card_cache if k[0] == husbando_file]:
+        lite_card_cache_bytes -= sys.getsizeof(lite_card_cache.pop(stale)["src"])
+    lite_card_cache[(husbando_file, rarity)] = {"key": key, "src": src}
+    lite_card_cache_bytes += sys.getsizeof(src)
+    while len(lite_card_cache) > LITE_CARD_CACHE_SIZE:
+        _, evicted = lite_card_cache.popitem(last=False)
+        lite_card_cache_bytes -= sys.getsizeof(evicted["src"])
+
+def deep_getsizeof(obj, seen: Optional[set] = None) -> int:
+    """Approximate the bytes held by a container and everything it references."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_getsizeof(k, seen) + deep_getsizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_getsizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_getsizeof(vars(obj), seen)
+    return size
+
+def get_memory_report() -> List[Tuple[str, int, str]]:
+    """Return (component, bytes, detail) rows for the add-on's large objects."""
+    pixmaps = [pixmap for get_pixmaps in pixmap_sources.values() for pixmap in get_pixmaps()]
+    pixmap_total = sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8 for pixmap in pixmaps)
+    return [
+        ("Image cache (base64)", image_cache_bytes, f"{len(image_cache)} images"),
+        ("Lite overlay cards", lite_card_cache_bytes, f"{len(lite_card_cache)} cards"),
+        ("Pixmaps in open dialogs", pixmap_total, f"{len(pixmaps)} pixmaps, {len(pixmap_sources)} dialogs"),
+        ("Collection state", deep_getsizeof(game.state.collection), f"{len(game.state.collection)} husbandos"),
+        ("Collection index", deep_getsizeof(game.collection_index), ""),
+        ("Image list", deep_getsizeof(game.state.husbando_images), f"{len(game.state.husbando_images)} files"),
+    ]
+
+def format_bytes(size: int) -> str:
+    """Format a byte count for display."""
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def take_memory_snapshot() -> Optional[str]:
+    """
+    Take a tracemalloc snapshot and export its diff against the previous one.
+    Starts tracing on the first call. Returns the path of the exported diff,
+    or None if this call only recorded the baseline.
+    """
+    global memory_snapshot
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        memory_snapshot = None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    previous, memory_snapshot = memory_snapshot, snapshot
+    if previous is None:
+        return None
+
+    addon_dir = game.get_addon_dir()
+    diff = snapshot.compare_to(previous, "lineno")
+    addon_diff = [stat for stat in diff if stat.traceback[0].filename.startswith(addon_dir)]
+    export_path = os.path.join(addon_dir, f"memory_diff_{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt")
+    with open(export_path, 'w', encoding='utf-8') as f:
+        f.write(f"{ADDON_NAME} memory diff, exported {datetime.now().isoformat()}\n\n")
+        f.write("Add-on components:\n")
+        for name, size, detail in get_memory_report():
+            f.write(f"  {name}: {format_bytes(size)} {detail}\n")
+        f.write("\nTop allocation changes in the add-on:\n")
+        for stat in addon_diff[:25]:
+            f.write(f"  {stat}\n")
+        f.write("\nTop allocation changes overall:\n")
+        for stat in diff[:50]:
+            f.write(f"  {stat}\n")
+    return export_path
+
+def stop_memory_tracing():
+    """Stop tracemalloc and drop the baseline snapshot."""
+    global memory_snapshot
+    memory_snapshot = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def clear_image_cache():
+    """Release all cached base64 image data and lite overlay cards."""
+    global image_cache_bytes, lite_card_cache_bytes
+    image_cache.clear()
+    image_cache_bytes = 0
+    lite_card_cache.clear()
+    lite_card_cache_bytes = 0
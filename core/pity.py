@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Pity system: per-pity-step rarity tables, guaranteed-minimum-rarity tickets,
+and the counters that move between pulls.
+"""
+
+import bisect
+import itertools
+import math
+from typing import Any, Dict, Mapping, Tuple
+
+from .constants import PITY_MAX_TABLE_ROWS, PITY_RULES
+
+
+def compile_pity_rules(raw: Any, rarity_order: Tuple[str, ...]) -> Tuple[Tuple[str, int, int, float], ...]:
+    """
+    Validate the pity rules and return (rarity, soft, hard, step) tuples,
+    highest rarity first. Rules for rarities not in rarity_order are dropped.
+    Rules whose tables would exceed PITY_MAX_TABLE_ROWS rows fall back to PITY_RULES.
+    """
+    rules = {name: dict(rule) for name, rule in PITY_RULES.items()}
+    if isinstance(raw, dict):
+        for name, rule in raw.items():
+            if isinstance(rule, dict):
+                rules.setdefault(name, {}).update(rule)
+            elif rule is None:
+                rules.pop(name, None)   # "pity": {"epic": null} turns a rule off
+    compiled = []
+    for name, rule in rules.items():
+        if name not in rarity_order:
+            continue
+        hard = rule.get("hard")
+        soft = rule.get("soft", hard)
+        step = rule.get("step", 0.0)
+        if not isinstance(hard, int) or hard < 1:
+            continue
+        if not isinstance(soft, int) or not 0 <= soft <= hard:
+            soft = hard
+        if not isinstance(step, (int, float)) or step < 0:
+            step = 0.0
+        compiled.append((name, soft, hard, float(step)))
+    compiled.sort(key=lambda rule: rarity_order.index(rule[0]), reverse=True)
+    if math.prod(hard for _, _, hard, _ in compiled) > PITY_MAX_TABLE_ROWS and raw is not None:
+        return compile_pity_rules(None, rarity_order)
+    return tuple(compiled)
+
+def boosted_chance(base: float, pulls: int, soft: int, hard: int, step: float) -> float:
+    """Chance of at least the rule's rarity on the pulls-th pull since the last hit."""
+    if pulls >= hard:
+        return 1.0
+    if pulls > soft:
+        return min(1.0, base + step * (pulls - soft))
+    return base
+
+def build_pity_tables(
+    rarity_order: Tuple[str, ...],
+    cumulative: Tuple[float, ...],
+    rules: Tuple[Tuple[str, int, int, float], ...],
+) -> Dict[Tuple[int, ...], Tuple[float, ...]]:
+    """
+    Precompute the cumulative rarity distribution for every combination of
+    pity counters, so a pull is a single table lookup plus a bisect.
+    Each rule raises the chance of "at least its rarity"; the extra mass is
+    taken proportionally from the rarities below it.
+    """
+    chances = [cumulative[0]] + [cumulative[i] - cumulative[i - 1] for i in range(1, len(cumulative))]
+    ranks = [rarity_order.index(name) for name, _, _, _ in rules]
+    tables = {}
+    for counters in itertools.product(*(range(hard) for _, _, hard, _ in rules)):
+        # Chance of "at least rank", for the rules' ranks, highest first
+        at_least = []
+        floor = 0.0
+        for (name, soft, hard, step), rank, count in zip(rules, ranks, counters):
+            base = sum(chances[rank:])
+            floor = max(floor, boosted_chance(base, count + 1, soft, hard, step))
+            at_least.append(floor)
+        # Spread each band's mass over its rarities in proportion to their base chances
+        table = list(chances)
+        bounds = [len(chances)] + ranks + [0]
+        masses = [at_least[0] if at_least else 1.0]
+        masses += [at_least[i] - at_least[i - 1] for i in range(1, len(at_least))]
+        masses += [1.0 - at_least[-1]] if at_least else []
+        for (high, low), mass in zip(zip(bounds, bounds[1:]), masses):
+            band = chances[low:high]
+            band_total = sum(band)
+            for i in range(low, high):
+                table[i] = mass * chances[i] / band_total if band_total > 0 else (mass if i == low else 0.0)
+        running = 0.0
+        row = []
+        for chance in table:
+            running += chance
+            row.append(running)
+        row[-1] = 1.0
+        tables[counters] = tuple(row)
+    return tables
+
+def is_boosted(row: Tuple[float, ...], cumulative: Tuple[float, ...]) -> bool:
+    """Whether a table row differs from the base cumulative chances, i.e. pity changed the odds."""
+    # The last entry is always 1.0 in the tables, so only the others can tell
+    return any(abs(boosted - base) > 1e-9 for boosted, base in zip(row[:-1], cumulative[:-1]))
+
+def draw_rarity(
+    rarity_order: Tuple[str, ...],
+    tables: Mapping[Tuple[int, ...], Tuple[float, ...]],
+    counters: Tuple[int, ...],
+    r: float,
+    min_rarity: str = "",
+) -> str:
+    """
+    Map a uniform variate to a rarity using the table for the pity counters.
+    With min_rarity, the variate is squeezed into the part of the table at or
+    above that rarity, i.e. the draw is conditioned on reaching it.
+    """
+    row = tables[counters]
+    if min_rarity:
+        low = row[rarity_order.index(min_rarity) - 1] if rarity_order.index(min_rarity) > 0 else 0.0
+        r = low + r * (1.0 - low)
+    return rarity_order[min(bisect.bisect_right(row, r), len(row) - 1)]
+
+def advance_pity(pity: Dict[str, int], rules, rarity_order: Tuple[str, ...], rarity: str):
+    """Reset the counters the pulled rarity satisfies and advance the others."""
+    rank = rarity_order.index(rarity)
+    for name, _, hard, _ in rules:
+        if rank >= rarity_order.index(name):
+            pity[name] = 0
+        else:
+            pity[name] = min(pity.get(name, 0) + 1, hard - 1)
+
+def pity_counters(pity: Mapping[str, int], rules) -> Tuple[int, ...]:
+    """Return the table key for the stored counters, clamped to the current rules."""
+    return tuple(min(max(int(pity.get(name, 0)), 0), hard - 1) for name, _, hard, _ in rules)
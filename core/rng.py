@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Seedable per-subsystem random streams with record and replay.
+"""
+
+import json
+import os
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .constants import RNG_BLOCK_SIZE, RNG_STREAMS
+from .store import notify
+
+
+class RngStream:
+    """
+    Independent, seedable random stream for one subsystem.
+    Variates are pre-generated in blocks; the sequence only depends on the seed,
+    no matter how single and bulk draws are interleaved.
+    """
+
+    def __init__(self, name: str, seed: int, block_size: int = RNG_BLOCK_SIZE):
+        self.name = name
+        self.seed = seed
+        self.block_size = block_size
+        self._rng = random.Random(seed)
+        self._block = []
+        self._pos = 0
+
+    def random(self) -> float:
+        """Return the next variate in [0.0, 1.0)."""
+        if self._pos >= len(self._block):
+            self._block = [self._rng.random() for _ in range(self.block_size)]
+            self._pos = 0
+        value = self._block[self._pos]
+        self._pos += 1
+        return value
+
+    def randoms(self, n: int) -> List[float]:
+        """Return the next n variates at once, for bulk draws."""
+        values = self._block[self._pos:self._pos + n]
+        self._pos += len(values)
+        if len(values) < n:
+            values.extend(self._rng.random() for _ in range(n - len(values)))
+        return values
+
+    def choice(self, seq):
+        """Return a random element from a non-empty sequence."""
+        return seq[int(self.random() * len(seq))]
+
+rng_streams = {}    # stream name -> RngStream, updated in place by init_rng_streams
+rng_session = ""    # Id of the current (recorded or replayed) RNG session
+
+def find_rng_session(log_path: str, session_id: str = "") -> Optional[Dict[str, Any]]:
+    """Return a recorded RNG session by id, or the latest one if no id is given."""
+    if not os.path.exists(log_path):
+        return None
+    found = None
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if not session_id or entry.get("session") == session_id:
+                found = entry
+    return found
+
+def init_rng_streams(mode: str, log_path: str, replay_session: str = ""):
+    """
+    Create the gacha, mini-game, and buddy streams.
+    mode selects the behavior:
+    - "normal": fresh seeds, nothing logged
+    - "record": fresh seeds, appended to the session log
+    - "replay": seeds of replay_session (or the latest session)
+    """
+    global rng_session
+    seeds = None
+    if mode == "replay":
+        entry = find_rng_session(log_path, replay_session)
+        if entry:
+            rng_session = entry["session"]
+            seeds = entry["seeds"]
+            notify(f"Replaying RNG session {rng_session}")
+        else:
+            notify("No recorded RNG session found, using fresh seeds.")
+    if seeds is None:
+        system_rng = random.SystemRandom()
+        seeds = {name: system_rng.getrandbits(64) for name in RNG_STREAMS}
+        rng_session = datetime.now().strftime("%Y%m%d-%H%M%S")
+        if mode == "record":
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"session": rng_session, "seeds": seeds}) + "\n")
+    rng_streams.clear()
+    rng_streams.update({name: RngStream(name, int(seeds[name])) for name in RNG_STREAMS})
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Thread-safe container for the mutable game state, with transactional
+mutation and cached immutable snapshots.
+"""
+
+import copy
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from .store import store
+
+# Fields restored as a whole when a transaction rolls back; collection
+# entries are journaled one by one instead (see GameState.entry)
+JOURNALED_FIELDS = (
+    "user_points", "current_streak", "current_husbando", "login_streak",
+    "last_login_date", "achievements", "inventory", "rotation_answers",
+)
+
+
+class StateSnapshot(NamedTuple):
+    """Immutable, consistent view of the game state for readers on any thread."""
+    version: int
+    user_points: int
+    current_streak: int
+    collection: Mapping[str, Mapping[str, Any]]
+    current_husbando: Optional[Tuple[str, str, str]]
+    login_streak: int
+    last_login_date: str
+    achievements: Mapping[str, Any]
+    inventory: Mapping[str, Any]
+    rotation_answers: int
+    husbando_images: Tuple[str, ...]
+
+def freeze(value):
+    """Return a read-only deep copy of nested dicts and lists."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class GameState:
+    """
+    Single owner of the game's mutable state.
+    All mutation happens inside `with state.transaction():`, which holds an
+    RLock (transactions nest), journals what it touches, and on an exception
+    restores the state from before the outermost transaction. Store events and
+    saves requested during a transaction run once it has committed, so
+    listeners only ever see committed state. Readers on other threads use
+    snapshot(), which is rebuilt at most once per committed version; the
+    version only moves when a transaction changed something, and entries
+    that didn't change keep their frozen copies.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = 0
+        self.user_points = 0
+        self.current_streak = 0
+        self.collection = {}
+        self.current_husbando = None
+        self.login_streak = 0
+        self.last_login_date = ""
+        self.achievements = {}   # e.g., {"first_pull": True, ...}
+        self.inventory = {}      # For items like upgrade materials, pity counters, and pull tickets
+        self.rotation_answers = 0  # Answers since the buddy last rotated
+        self.husbando_images = []  # Image files in the husbando folder (not persisted)
+        self._depth = 0
+        self._owner = None       # Thread running the current transaction
+        self._journal = None     # Outermost transaction: saved fields and original entries
+        self._after_commit = []  # (callback, args) to run once the outermost transaction commits
+        self._snapshot = None
+        self._frozen_entries = {}  # file -> read-only copy of the entry, shared by snapshots
+        self._dirty_entries = None # Files whose frozen copy is outdated, or None for all of them
+
+    @contextmanager
+    def transaction(self):
+        """Mutate the state atomically; nested transactions join the outermost one."""
+        with self.lock:
+            outermost = self._depth == 0
+            if outermost:
+                self._owner = threading.get_ident()
+                self._journal = {
+                    "fields": {name: copy.deepcopy(getattr(self, name)) for name in JOURNALED_FIELDS},
+                    "entries": {},
+                    "collection": self.collection,
+                    "husbando_images": self.husbando_images,
+                }
+                self._after_commit = []
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if outermost:
+                    self._rollback()
+                raise
+            self._depth -= 1
+            if not outermost:
+                return
+            if self._record_changes():
+                self.version += 1
+            self._owner = None
+            self._journal = None
+            pending, self._after_commit = self._after_commit, []
+        for callback, args in pending:
+            callback(*args)
+
+    def _record_changes(self) -> bool:
+        """Mark the entries the outermost transaction changed; return whether it changed anything."""
+        journal = self._journal
+        if self.collection is not journal["collection"]:
+            self._dirty_entries = None
+            return True
+        changed = [husbando_file for husbando_file, original in journal["entries"].items()
+                   if self.collection.get(husbando_file) != original]
+        if changed and self._dirty_entries is not None:
+            self._dirty_entries.update(changed)
+        return bool(changed) or self.husbando_images is not journal["husbando_images"] or any(
+            getattr(self, name) != value for name, value in journal["fields"].items())
+
+    def _rollback(self):
+        """Restore the state saved when the outermost transaction began."""
+        for name, value in self._journal["fields"].items():
+            setattr(self, name, value)
+        self.collection = self._journal["collection"]
+        self.husbando_images = self._journal["husbando_images"]
+        for husbando_file, original in self._journal["entries"].items():
+            if original is None:
+                self.collection.pop(husbando_file, None)
+            else:
+                self.collection[husbando_file] = original
+        self._owner = None
+        self._journal = None
+        self._after_commit = []
+
+    def _require_transaction(self):
+        if self._depth == 0 or self._owner != threading.get_ident():
+            raise RuntimeError("Game state can only be modified inside state.transaction()")
+
+    def _journal_entry(self, husbando_file: str):
+        entries = self._journal["entries"]
+        if husbando_file not in entries:
+            original = self.collection.get(husbando_file)
+            entries[husbando_file] = dict(original) if original is not None else None
+
+    def entry(self, husbando_file: str) -> Dict[str, Any]:
+        """Return a collection entry for modification within the current transaction."""
+        self._require_transaction()
+        self._journal_entry(husbando_file)
+        return self.collection[husbando_file]
+
+    def add_entry(self, husbando_file: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add (or replace) a collection entry within the current transaction."""
+        self._require_transaction()
+        self._journal_entry(husbando_file)
+        self.collection[husbando_file] = data
+        return data
+
+    def remove_entry(self, husbando_file: str):
+        """Remove a collection entry within the current transaction."""
+        self._require_transaction()
+        self._journal_entry(husbando_file)
+        del self.collection[husbando_file]
+
+    def after_commit(self, callback: Callable, *args, once: bool = False):
+        """
+        Run a callback once the current transaction commits, or right away
+        outside of one. With once=True, repeated requests run it only once.
+        """
+        with self.lock:
+            if self._depth:
+                if once and (callback, args) in self._after_commit:
+                    return
+                self._after_commit.append((callback, args))
+                return
+        callback(*args)
+
+    def emit(self, event: str, *args):
+        """Emit a store event after the current transaction commits."""
+        self.after_commit(store.emit, event, *args)
+
+    def snapshot(self) -> StateSnapshot:
+        """Return an immutable view of the last committed state."""
+        with self.lock:
+            if self._depth:
+                raise RuntimeError("Snapshots are only taken outside of transactions")
+            if self._snapshot is None or self._snapshot.version != self.version:
+                self._snapshot = StateSnapshot(
+                    version=self.version,
+                    user_points=self.user_points,
+                    current_streak=self.current_streak,
+                    collection=MappingProxyType(self._frozen_collection()),
+                    current_husbando=self.current_husbando,
+                    login_streak=self.login_streak,
+                    last_login_date=self.last_login_date,
+                    achievements=freeze(self.achievements),
+                    inventory=freeze(self.inventory),
+                    rotation_answers=self.rotation_answers,
+                    husbando_images=tuple(self.husbando_images),
+                )
+            return self._snapshot
+
+    def _frozen_collection(self) -> Dict[str, Mapping[str, Any]]:
+        """Refresh the frozen copies of changed entries and return a new dict of all of them."""
+        if self._dirty_entries is None:
+            self._frozen_entries = {
+                husbando_file: MappingProxyType(dict(data)) for husbando_file, data in self.collection.items()
+            }
+        else:
+            for husbando_file in self._dirty_entries:
+                data = self.collection.get(husbando_file)
+                if data is None:
+                    self._frozen_entries.pop(husbando_file, None)
+                else:
+                    self._frozen_entries[husbando_file] = MappingProxyType(dict(data))
+        self._dirty_entries = set()
+        return dict(self._frozen_entries)
+
+state = GameState()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Observable store and user notifications for the Husbando Gacha core.
+"""
+
+from typing import Callable, Optional
+
+
+class HusbandoStore:
+    """
+    Change notification hub for collection, points, and buddy state.
+    Mutating functions emit fine-grained events so open views can update only
+    the affected widgets:
+    - entry_changed(husbando_file)
+    - entry_removed(husbando_file)
+    - points_changed(points)
+    - buddy_changed(current_husbando)
+    """
+
+    EVENTS = ("entry_changed", "entry_removed", "points_changed", "buddy_changed")
+
+    def __init__(self):
+        self._listeners = {event: [] for event in self.EVENTS}
+
+    def subscribe(self, event: str, callback):
+        """Register a callback for an event."""
+        self._listeners[event].append(callback)
+
+    def unsubscribe(self, event: str, callback):
+        """Remove a previously registered callback."""
+        if callback in self._listeners[event]:
+            self._listeners[event].remove(callback)
+
+    def emit(self, event: str, *args):
+        """Notify all subscribers of an event."""
+        for callback in list(self._listeners[event]):
+            callback(*args)
+
+store = HusbandoStore()
+
+# The core has no GUI; the add-on entry point installs Anki's tooltip here
+notifier: Optional[Callable[[str], None]] = None
+
+def set_notifier(callback: Optional[Callable[[str], None]]):
+    """Set the function used to show short messages to the user."""
+    global notifier
+    notifier = callback
+
+def notify(message: str):
+    """Show a short message to the user, if a notifier is installed."""
+    if notifier:
+        notifier(message)
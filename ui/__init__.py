@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Qt dialogs and reviewer integration of the Husbando Gacha add-on.
+Each dialog module is imported the first time its menu action fires.
+"""
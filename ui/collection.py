@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Collection dialog with live updates, search, filters, and fusion controls.
+"""
+
+import os
+from typing import Dict, Any
+
+from aqt import mw
+from aqt.qt import *
+from aqt.utils import showInfo, tooltip
+
+from ..core import game
+from ..core.constants import COLLECTION_FILTERS, COLLECTION_SORTS, FUSION_COST, RARITIES
+from .common import open_zoom_dialog, subscribe_dialog, track_dialog_pixmaps
+
+
+def run_auto_fuse():
+    """Auto-fuse the whole collection and report a single summary."""
+    upgrades = game.auto_fuse_all()
+    if not upgrades:
+        tooltip("Nothing to fuse! (favorites and locked husbandos are skipped)")
+        return
+    total = sum(upgrades.values())
+    lines = [f"{src.capitalize()} -> {dst.capitalize()}: {n}" for (src, dst), n in upgrades.items()]
+    showInfo(f"<h3>Auto-Fuse complete</h3><p>{total} fusions, {total * FUSION_COST} copies used.</p>"
+             f"<p>{'<br>'.join(lines)}</p>")
+
+def build_collection_card(husbando_file: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the widgets for one collection entry and return them for in-place updates."""
+    card_widget = QWidget()
+    card_layout = QVBoxLayout()
+    card_widget.setLayout(card_layout)
+    image_path = os.path.join(game.husbando_folder, husbando_file)
+    pixmap = None
+    
+    if os.path.exists(image_path):
+        image_label = QLabel()
+        pixmap = QPixmap(image_path)
+        pixmap = pixmap.scaled(150, 200, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        image_label.setPixmap(pixmap)
+        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        card_layout.addWidget(image_label)
+        
+        # Add a Zoom button for the image
+        zoom_btn = QPushButton("Zoom")
+        zoom_btn.clicked.connect(lambda checked, path=image_path: open_zoom_dialog(path))
+        card_layout.addWidget(zoom_btn)
+    
+    name_label = QLabel()
+    name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    card_layout.addWidget(name_label)
+    
+    count_label = QLabel()
+    count_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    card_layout.addWidget(count_label)
+    
+    # Display the current HP of the husbando
+    hp_label = QLabel()
+    hp_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    card_layout.addWidget(hp_label)
+    
+    # Look the rarity up on click, since fusion may have changed it
+    current_btn = QPushButton("Set as Current")
+    current_btn.clicked.connect(lambda checked, file=husbando_file: game.set_current_husbando(file, game.state.collection[file]["rarity"]))
+    card_layout.addWidget(current_btn)
+    
+    # Fuse button to upgrade card rarity if enough copies
+    fuse_btn = QPushButton("Fuse")
+    fuse_btn.clicked.connect(lambda checked, file=husbando_file: game.fuse_husbando(file))
+    card_layout.addWidget(fuse_btn)
+    
+    # Locked husbandos are skipped by Auto-Fuse All
+    lock_btn = QPushButton()
+    lock_btn.clicked.connect(lambda checked, file=husbando_file: game.toggle_lock(file))
+    card_layout.addWidget(lock_btn)
+    
+    card = {
+        "widget": card_widget,
+        "name": name_label,
+        "count": count_label,
+        "hp": hp_label,
+        "fuse": fuse_btn,
+        "lock": lock_btn,
+        "pixmap": pixmap,
+    }
+    update_collection_card(card, husbando_file, data)
+    return card
+
+def update_collection_card(card: Dict[str, Any], husbando_file: str, data: Dict[str, Any]):
+    """Refresh the labels and buttons of an existing collection card."""
+    rarity_color = game.get_compiled_config().rarity_colors.get(data["rarity"], RARITIES["common"]["color"])
+    card["name"].setText(f"<span style='color:{rarity_color};'>{os.path.splitext(husbando_file)[0]}</span>")
+    card["count"].setText(f"Copies: {data['count']}")
+    card["hp"].setText(f"HP: {data.get('hp', 100)}")
+    card["fuse"].setEnabled(data["count"] >= FUSION_COST and game.get_next_rarity(data["rarity"]) is not None)
+    card["lock"].setText("Unlock" if data.get("locked") else "Lock")
+
+def open_collection_dialog():
+    """Open the dialog to view husbando collection with live updates, zoom, and HP display."""
+    if not game.state.collection:
+        showInfo("Your collection is empty! Study to earn points and pull husbandos.")
+        return
+    
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Husbando Collection")
+    dialog.setMinimumSize(800, 600)
+    
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    points_label = QLabel(f"<h3>Current Points: {game.state.user_points}</h3>")
+    layout.addWidget(points_label)
+    subscribe_dialog(dialog, "points_changed", lambda points: points_label.setText(f"<h3>Current Points: {points}</h3>"))
+    
+    scroll_area = QScrollArea()
+    scroll_area.setWidgetResizable(True)
+    scroll_content = QWidget()
+    grid_layout = QGridLayout(scroll_content)
+    
+    max_cols = 4
+    cards = {}   # husbando_file -> card widgets, built lazily and updated in place on store events
+    order = []   # Files currently shown, in display order
+    # husbando_file -> index key the current order reflects, kept up to date per store event
+    view_keys = {husbando_file: game.collection_index.key(husbando_file) for husbando_file in game.state.collection}
+    view_pending = [False]   # A re-query is scheduled for the next event-loop turn
+    
+    def reflow():
+        """Re-position the card widgets for the current order without rebuilding them."""
+        shown = set(order)
+        for husbando_file, card in cards.items():
+            grid_layout.removeWidget(card["widget"])
+            if husbando_file not in shown:
+                card["widget"].hide()
+        for index, husbando_file in enumerate(order):
+            if husbando_file not in cards:
+                cards[husbando_file] = build_collection_card(husbando_file, game.state.collection[husbando_file])
+            grid_layout.addWidget(cards[husbando_file]["widget"], index // max_cols, index % max_cols)
+            cards[husbando_file]["widget"].show()
+    
+    # Search, filter, and sort controls
+    controls_layout = QHBoxLayout()
+    search_edit = QLineEdit()
+    search_edit.setPlaceholderText("Search by name...")
+    controls_layout.addWidget(search_edit)
+    filter_combo = QComboBox()
+    filter_combo.addItems(COLLECTION_FILTERS)
+    controls_layout.addWidget(filter_combo)
+    sort_combo = QComboBox()
+    sort_combo.addItems(list(COLLECTION_SORTS))
+    controls_layout.addWidget(sort_combo)
+    layout.addLayout(controls_layout)
+    
+    def apply_view():
+        """Re-run the indexed query for the current search, filter, and sort."""
+        view_pending[0] = False
+        order[:] = game.query_collection(
+            search_edit.text(),
+            filter_combo.currentText(),
+            COLLECTION_SORTS[sort_combo.currentText()],
+        )
+        reflow()
+    
+    def schedule_view():
+        """Re-query once per event-loop turn, however many entries a transaction changed."""
+        def run_pending():
+            if view_pending[0] and dialog.isVisible():
+                apply_view()
+        
+        if not view_pending[0]:
+            view_pending[0] = True
+            QTimer.singleShot(0, run_pending)
+    
+    search_edit.textChanged.connect(lambda _: apply_view())
+    filter_combo.currentIndexChanged.connect(lambda _: apply_view())
+    sort_combo.currentIndexChanged.connect(lambda _: apply_view())
+    apply_view()
+    
+    def on_entry_changed(husbando_file):
+        data = game.state.collection.get(husbando_file)
+        if data is None:
+            return
+        if husbando_file in cards:
+            update_collection_card(cards[husbando_file], husbando_file, data)
+        # Only a change to a sorted or filtered field can move the entry or take it in/out of view
+        key = game.collection_index.key(husbando_file)
+        if key != view_keys.get(husbando_file):
+            view_keys[husbando_file] = key
+            schedule_view()
+    
+    def on_entry_removed(husbando_file):
+        view_keys.pop(husbando_file, None)
+        card = cards.pop(husbando_file, None)
+        if card is None:
+            return
+        grid_layout.removeWidget(card["widget"])
+        card["widget"].deleteLater()
+        schedule_view()
+    
+    subscribe_dialog(dialog, "entry_changed", on_entry_changed)
+    subscribe_dialog(dialog, "entry_removed", on_entry_removed)
+    track_dialog_pixmaps(dialog, lambda: [card["pixmap"] for card in cards.values() if card["pixmap"]])
+    
+    scroll_area.setWidget(scroll_content)
+    layout.addWidget(scroll_area)
+    
+    auto_fuse_btn = QPushButton("Auto-Fuse All")
+    auto_fuse_btn.clicked.connect(run_auto_fuse)
+    layout.addWidget(auto_fuse_btn)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    layout.addWidget(close_btn)
+    
+    dialog.exec()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers shared by the Husbando Gacha dialogs.
+"""
+
+import os
+
+from aqt import mw
+from aqt.qt import *
+from aqt.utils import tooltip
+
+from ..core.memory import pixmap_sources
+from ..core.store import store
+
+
+def subscribe_dialog(dialog, event: str, callback):
+    """
+    Subscribe a callback for as long as the dialog stays open. It is dropped
+    when the dialog finishes or is destroyed, and skipped if Qt already
+    deleted the dialog before either signal got through.
+    """
+    def guarded(*args):
+        if sip.isdeleted(dialog):
+            store.unsubscribe(event, guarded)
+            return
+        callback(*args)
+    
+    store.subscribe(event, guarded)
+    dialog.finished.connect(lambda _: store.unsubscribe(event, guarded))
+    dialog.destroyed.connect(lambda *_: store.unsubscribe(event, guarded))
+
+def track_dialog_pixmaps(dialog, get_pixmaps):
+    """Account for the pixmaps an open dialog holds until it is closed."""
+    key = id(dialog)
+    pixmap_sources[key] = get_pixmaps
+    dialog.finished.connect(lambda _: pixmap_sources.pop(key, None))
+
+def open_zoom_dialog(image_path):
+    """Open a dialog displaying a larger version of the image."""
+    if not os.path.exists(image_path):
+        tooltip(f"Image not found: {image_path}")
+        return
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Zoomed Image")
+    dialog.setMinimumSize(600, 600)
+    
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    # Use a scroll area in case the image is larger than the dialog
+    scroll_area = QScrollArea()
+    scroll_area.setWidgetResizable(True)
+    layout.addWidget(scroll_area)
+    
+    content = QWidget()
+    scroll_area.setWidget(content)
+    content_layout = QVBoxLayout()
+    content.setLayout(content_layout)
+    
+    image_label = QLabel()
+    pixmap = QPixmap(image_path)
+    image_label.setPixmap(pixmap)
+    track_dialog_pixmaps(dialog, lambda: [pixmap])
+    image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    content_layout.addWidget(image_label)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    content_layout.addWidget(close_btn)
+    
+    dialog.exec()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Lucky Roll mini-game dialog.
+"""
+
+from aqt import mw
+from aqt.qt import *
+from aqt.utils import tooltip
+
+from ..core import game
+from ..core.constants import LUCKY_ROLL_COST, LUCKY_ROLL_OUTCOMES
+from .common import subscribe_dialog
+
+
+def open_lucky_roll_dialog():
+    """Open a mini-game for lucky rolls, played one at a time or in bulk."""
+    if game.state.user_points < LUCKY_ROLL_COST:
+        tooltip("Not enough points for Lucky Roll!")
+        return
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Lucky Roll")
+    dialog.setMinimumSize(350, 300)
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    points_label = QLabel(f"Current Points: {game.state.user_points} ({LUCKY_ROLL_COST} per roll)")
+    layout.addWidget(points_label)
+    
+    roll_layout = QHBoxLayout()
+    roll_layout.addWidget(QLabel("Rolls:"))
+    rolls_spin = QSpinBox()
+    rolls_spin.setMinimum(1)
+    rolls_spin.setMaximum(max(1, game.state.user_points // LUCKY_ROLL_COST))
+    roll_layout.addWidget(rolls_spin)
+    roll_btn = QPushButton("Roll")
+    roll_layout.addWidget(roll_btn)
+    layout.addLayout(roll_layout)
+    
+    def on_points_changed(points):
+        points_label.setText(f"Current Points: {points} ({LUCKY_ROLL_COST} per roll)")
+        rolls_spin.setMaximum(max(1, points // LUCKY_ROLL_COST))
+    subscribe_dialog(dialog, "points_changed", on_points_changed)
+    
+    roll_label = QLabel("<h2>Spin the wheel!</h2>")
+    roll_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(roll_label)
+    
+    result_table = QTableWidget(0, 3)
+    result_table.setHorizontalHeaderLabels(["Outcome", "Times", "Reward"])
+    result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    layout.addWidget(result_table)
+    
+    def do_roll():
+        result = game.play_lucky_rolls(rolls_spin.value())
+        if not result:
+            tooltip("Not enough points for Lucky Roll!")
+            return
+        rewards = dict(LUCKY_ROLL_OUTCOMES)
+        result_table.setRowCount(len(result["tally"]))
+        for row, (outcome, count) in enumerate(result["tally"].items()):
+            unit = "XP" if outcome == "Bonus XP" else "points"
+            result_table.setItem(row, 0, QTableWidgetItem(outcome))
+            result_table.setItem(row, 1, QTableWidgetItem(str(count)))
+            result_table.setItem(row, 2, QTableWidgetItem(f"+{count * rewards[outcome]} {unit}"))
+        net = result["points"] - result["cost"]
+        roll_label.setText(f"<h3>{result['rolls']} rolls: {'+' if net >= 0 else ''}{net} points, +{result['xp']} XP</h3>")
+    roll_btn.clicked.connect(do_roll)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    layout.addWidget(close_btn)
+    dialog.exec()
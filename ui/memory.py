@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Memory diagnostics dialog.
+"""
+
+import tracemalloc
+
+from aqt import mw
+from aqt.qt import *
+from aqt.utils import tooltip
+
+from ..core.memory import (
+    clear_image_cache, format_bytes, get_memory_report, import_times,
+    stop_memory_tracing, take_memory_snapshot,
+)
+
+
+def get_import_times_html() -> str:
+    """Render the measured module import times as an HTML table."""
+    rows = "".join(
+        f"<tr><td>{name}</td><td align='right'>{seconds * 1000:.1f} ms</td></tr>"
+        for name, seconds in import_times.items()
+    )
+    return f"<h3>Import times</h3><table cellspacing='6'>{rows}</table>"
+
+def open_memory_dialog():
+    """Show memory usage of the add-on and manage tracemalloc snapshots."""
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Memory Diagnostics")
+    dialog.setMinimumSize(450, 300)
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    report_label = QLabel()
+    report_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
+    layout.addWidget(report_label)
+    
+    def refresh_report():
+        rows = "".join(
+            f"<tr><td>{name}</td><td align='right'>{format_bytes(size)}</td><td>{detail}</td></tr>"
+            for name, size, detail in get_memory_report()
+        )
+        tracing = "on" if tracemalloc.is_tracing() else "off"
+        report_label.setText(f"<h3>Memory</h3><table cellspacing='6'>{rows}</table><p>tracemalloc: {tracing}</p>"
+                             f"{get_import_times_html()}")
+    refresh_report()
+    
+    def on_snapshot():
+        export_path = take_memory_snapshot()
+        if export_path:
+            tooltip(f"Memory diff exported to {export_path}")
+        else:
+            tooltip("Baseline snapshot taken. Take another snapshot later to export a diff.")
+        refresh_report()
+    
+    buttons_layout = QHBoxLayout()
+    refresh_btn = QPushButton("Refresh")
+    refresh_btn.clicked.connect(refresh_report)
+    buttons_layout.addWidget(refresh_btn)
+    snapshot_btn = QPushButton("Take Snapshot")
+    snapshot_btn.clicked.connect(on_snapshot)
+    buttons_layout.addWidget(snapshot_btn)
+    stop_btn = QPushButton("Stop Tracing")
+    stop_btn.clicked.connect(lambda: (stop_memory_tracing(), refresh_report()))
+    buttons_layout.addWidget(stop_btn)
+    clear_btn = QPushButton("Clear Image Cache")
+    clear_btn.clicked.connect(lambda: (clear_image_cache(), refresh_report()))
+    buttons_layout.addWidget(clear_btn)
+    layout.addLayout(buttons_layout)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    layout.addWidget(close_btn)
+    dialog.exec()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Gacha pull dialog with a short drawing animation.
+"""
+
+import os
+
+from aqt import mw
+from aqt.qt import *
+
+from ..core import game
+from ..core.constants import MULTI_PULL_COUNT, RARITIES
+from .common import track_dialog_pixmaps
+
+
+def open_pull_dialog():
+    """Open the dialog for pulling husbando cards with an animation."""
+    result = game.pull_husbando()
+    if not result:
+        return
+
+    # Show pull animation dialog
+    anim_dialog = QDialog(mw)
+    anim_dialog.setWindowTitle("Pulling Husbando...")
+    anim_dialog.setMinimumSize(300, 200)
+    anim_layout = QVBoxLayout()
+    anim_dialog.setLayout(anim_layout)
+    anim_label = QLabel("<h2>Drawing your husbando...</h2>")
+    anim_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    anim_layout.addWidget(anim_label)
+    anim_dialog.show()
+    
+    QTimer.singleShot(1500, lambda: finish_pull_dialog(anim_dialog, result))
+
+def finish_pull_dialog(anim_dialog, result):
+    """Finish the pull animation and show the result."""
+    anim_dialog.accept()
+    husbando_file, rarity, file_path = result
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Husbando Pull Result")
+    dialog.setMinimumSize(400, 500)
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    rarity_color = game.get_compiled_config().rarity_colors.get(rarity, RARITIES["common"]["color"])
+    rarity_label = QLabel(f"<h1 style='color:{rarity_color};text-align:center;'>{rarity.upper()}</h1>")
+    rarity_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(rarity_label)
+    
+    image_label = QLabel()
+    pixmap = QPixmap(file_path)
+    pixmap = pixmap.scaled(300, 400, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    image_label.setPixmap(pixmap)
+    track_dialog_pixmaps(dialog, lambda: [pixmap])
+    image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(image_label)
+    
+    name_label = QLabel(os.path.splitext(husbando_file)[0])
+    name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(name_label)
+    
+    count = game.state.collection[husbando_file]["count"]
+    count_text = "First pull!" if count == 1 else f"You now have {count} copies!"
+    info_label = QLabel(count_text)
+    info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(info_label)
+    
+    pity_label = QLabel(get_pity_text())
+    pity_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(pity_label)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    layout.addWidget(close_btn)
+    pull_again = QPushButton("Again")
+    pull_again.clicked.connect(dialog.accept)
+    pull_again.clicked.connect(open_pull_dialog)
+    layout.addWidget(pull_again)
+    
+    dialog.exec()
+
+def get_pity_text() -> str:
+    """Describe the pity counters and the pull tickets the player owns."""
+    parts = [f"{rarity.capitalize()} pity: {count}/{hard}" for rarity, count, hard in game.get_pity_status()]
+    tickets = game.state.inventory.get("tickets", {})
+    parts += [f"{rarity.capitalize()} tickets: {count}" for rarity, count in tickets.items() if count]
+    return " | ".join(parts)
+
+def open_multi_pull_dialog():
+    """Pull several husbandos at once and show all results in one dialog."""
+    results = game.pull_husbandos(MULTI_PULL_COUNT)
+    if not results:
+        return
+    dialog = QDialog(mw)
+    dialog.setWindowTitle(f"Husbando Pull x{len(results)}")
+    dialog.setMinimumSize(700, 500)
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    grid_layout = QGridLayout()
+    pixmaps = []
+    compiled = game.get_compiled_config()
+    for index, (husbando_file, rarity, file_path) in enumerate(results):
+        cell = QVBoxLayout()
+        image_label = QLabel()
+        pixmap = QPixmap(file_path).scaled(100, 133, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        pixmaps.append(pixmap)
+        image_label.setPixmap(pixmap)
+        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        cell.addWidget(image_label)
+        rarity_color = compiled.rarity_colors.get(rarity, RARITIES["common"]["color"])
+        name_label = QLabel(f"<span style='color:{rarity_color};'><b>{rarity.upper()}</b><br>{os.path.splitext(husbando_file)[0]}</span>")
+        name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        cell.addWidget(name_label)
+        grid_layout.addLayout(cell, index // 5, index % 5)
+    track_dialog_pixmaps(dialog, lambda: pixmaps)
+    layout.addLayout(grid_layout)
+    
+    pity_label = QLabel(get_pity_text())
+    pity_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(pity_label)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    layout.addWidget(close_btn)
+    pull_again = QPushButton("Again")
+    pull_again.clicked.connect(dialog.accept)
+    pull_again.clicked.connect(open_multi_pull_dialog)
+    layout.addWidget(pull_again)
+    
+    dialog.exec()
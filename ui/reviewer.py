@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+"""
+Reviewer integration: the buddy overlay injected into cards and answer handling.
+Imported at startup, since the review hooks need it right away.
+"""
+
+import base64
+import json
+import os
+import re
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from aqt import mw
+from aqt.qt import *
+from aqt.utils import tooltip
+
+from ..core import game
+from ..core.constants import LITE_CARD_SIZE, OVERLAY_IMAGE_SIZE
+from ..core.memory import encode_image_to_base64, get_cached_lite_card, get_lite_card_key, store_lite_card
+
+BUDDY_INFO_MARKER = "<!--husbando-buddy-info-->"  # Filled in when a prepared overlay is shown
+
+# Buddy rotation: overlays are rendered on a worker thread ahead of time
+current_overlay = None   # {"buddy": (file, rarity, path), "html": ...} for the current buddy
+next_overlay = None      # The same for the buddy the next rotation switches to
+preparing = False        # A worker is rendering next_overlay
+prepare_generation = 0   # Bumped to discard results of outdated workers
+rotation_pending = False # A rotation is due and waits for next_overlay
+last_deck_id = None
+
+
+def get_buddy_info_html(husbando_file: str) -> str:
+    """Build the buddy stats block shown under the reviewer overlay image."""
+    buddy = game.state.snapshot().collection.get(husbando_file)
+    if buddy is None:
+        return ""
+    level, xp, xp_to_next = game.get_xp_progress(buddy)
+    hp = buddy.get("hp", 100)
+    return (f"<p><b>Current Buddy:</b> {os.path.splitext(husbando_file)[0]}<br>"
+            f"Level: {level} (XP: {xp}/{xp_to_next or 'MAX'}) (HP: {hp}/100)</p>")
+
+def get_buddy_stats_line(husbando_file: str) -> str:
+    """Build the plain-text stats line shown under the lite overlay card."""
+    buddy = game.state.snapshot().collection.get(husbando_file)
+    if buddy is None:
+        return ""
+    level, xp, xp_to_next = game.get_xp_progress(buddy)
+    return f"Lv {level} · XP {xp}/{xp_to_next or 'MAX'} · HP {buddy.get('hp', 100)}/100"
+
+def get_buddy_info(husbando_file: str, overlay_mode: str) -> str:
+    """Return the buddy stats in the form the overlay mode shows them."""
+    if overlay_mode == "lite":
+        return get_buddy_stats_line(husbando_file)
+    return get_buddy_info_html(husbando_file)
+
+def eval_in_reviewer(js: str):
+    """Run JavaScript in the reviewer webview if a review is in progress."""
+    if mw.state == "review" and mw.reviewer and mw.reviewer.web:
+        mw.reviewer.web.eval(js)
+
+def on_overlay_entry_changed(husbando_file: str):
+    """Update the overlay's stats in place when the current buddy changes."""
+    current = game.state.snapshot().current_husbando
+    if current and current[0] == husbando_file:
+        info = get_buddy_info(husbando_file, game.get_compiled_config().overlay_mode)
+        eval_in_reviewer(
+            "var el = document.getElementById('husbando-buddy-info');"
+            f"if (el) el.innerHTML = {json.dumps(info)};"
+        )
+
+def on_overlay_buddy_changed(buddy):
+    """Remove the overlay as soon as there is no current buddy anymore."""
+    if buddy is None:
+        eval_in_reviewer("var el = document.getElementById('husbando-overlay'); if (el) el.remove();")
+
+def build_overlay_html(husbando_file: str, image_src: str, buddy_info: str, style: Mapping[str, str]) -> str:
+    """Build the overlay markup for a buddy; pure string work, safe on a worker thread."""
+    title = os.path.splitext(husbando_file)[0]
+
+    # Unified HTML template with centered position
+    husbando_html = f"""
+<div id="husbando-overlay" style="
+    position: fixed;
+    top: 65%;
+    left: 10%;
+    transform: translate(-50%, -50%);
+    z-index: 1000;
+    text-align: center;
+    background: {style['container_bg']};
+    border-radius: 20px;
+    padding: 20px;
+    border: 2px solid {style['container_border']};
+    box-shadow: 0 0 35px {style['container_shadow']};
+    backdrop-filter: blur(12px);
+    width: 250px;
+    height: 525px;
+    color: white;
+    font-family: 'Arial', sans-serif;">
+    
+    <!-- Badge -->
+    <div style="
+         position: absolute;
+         top: -15px;
+         left: 50%;
+         transform: translateX(-50%);
+         background: {style['badge_bg']};
+         padding: 6px 25px;
+         border-radius: 25px;
+         font-size: 0.9rem;
+         font-weight: 700;
+         letter-spacing: 2px;
+         box-shadow: 0 4px 15px {style['box_shadow_color']};
+         border: 1px solid {style['badge_border']};
+         text-transform: uppercase;">
+         {style['badge']}
+    </div>
+    
+    <!-- Title -->
+    <div style="
+         color: #FDE68A;
+         font-weight: 800;
+         margin: 20px 0 15px 0;
+         font-size: 1.4rem;
+         text-transform: uppercase;
+         letter-spacing: 2px;
+         text-shadow: 0 0 12px rgba(251, 191, 36, 0.4);">
+         {title}
+    </div>
+    
+    <!-- Image Container -->
+    <div style="
+         border-radius: 12px;
+         overflow: hidden;
+         border: 2px solid {style['container_border']};
+         box-shadow: 0 0 25px {style['container_shadow']};
+         position: relative;
+         width: 250px;
+         height: 375px;">
+         <img src="{image_src}" style="
+              width: 100%;
+              height: 100%;
+              object-fit: cover;
+              display: block;
+              transition: transform 0.3s ease;">
+         <div style="
+              position: absolute;
+              top: 0;
+              left: 0;
+              right: 0;
+              bottom: 0;
+              background: linear-gradient(45deg, rgba(30,27,25,0.1), rgba(245,158,11,0.05));">
+         </div>
+    </div>
+    
+    <!-- Info Text -->
+    <div id="husbando-buddy-info" style="
+         margin: 18px 0 10px 0;
+         font-size: 0.95rem;
+         color: #FCD34D;
+         line-height: 1.5;
+         padding: 0 12px;
+         font-weight: 500;">
+         {buddy_info}
+    </div>
+    
+    <!-- Golden Sparkles -->
+    <div style="
+         position: absolute;
+         top: 15%;
+         left: -20px;
+         width: 50px;
+         height: 50px;
+         background: radial-gradient(circle, rgba(255,215,0,0.6) 0%, transparent 70%);
+         mix-blend-mode: overlay;
+         transform: rotate(25deg);
+         pointer-events: none;">
+    </div>
+    <div style="
+         position: absolute;
+         bottom: 25%;
+         right: -20px;
+         width: 40px;
+         height: 40px;
+         background: radial-gradient(circle, rgba(255,215,0,0.5) 0%, transparent 70%);
+         mix-blend-mode: overlay;
+         transform: rotate(-15deg);
+         pointer-events: none;">
+    </div>
+</div>
+"""
+    return husbando_html
+
+def build_lite_overlay_html(image_src: str, stats_line: str) -> str:
+    """Build the lite overlay: the pre-rendered card and a plain-text stats line, no filters or shadows."""
+    return f"""
+<div id="husbando-overlay" style="position: fixed; top: 65%; left: 10%; transform: translate(-50%, -50%);
+     z-index: 1000; width: 270px; text-align: center; font-family: 'Arial', sans-serif;">
+    <img src="{image_src}" width="270" height="450" style="display: block;">
+    <div id="husbando-buddy-info" style="margin-top: 4px; padding: 4px; font-size: 0.85rem;
+         color: #FCD34D; background: rgb(30, 30, 30); border-radius: 6px;">{stats_line}</div>
+</div>
+"""
+
+# -------------------------------
+# NEW: Lite Overlay (pre-rendered cards)
+# -------------------------------
+def css_colors(value: str) -> List[QColor]:
+    """Return the hex and rgb()/rgba() colors in a CSS value, e.g. the stops of a gradient."""
+    colors = []
+    for hex_color, rgb in re.findall(r"(#[0-9A-Fa-f]{3,8})|rgba?\(([^)]*)\)", value):
+        if hex_color:
+            colors.append(QColor(hex_color))
+            continue
+        parts = [part.strip() for part in rgb.split(",")]
+        color = QColor(*(int(part) for part in parts[:3]))
+        if len(parts) > 3:
+            color.setAlphaF(float(parts[3]))
+        colors.append(color)
+    return colors or [QColor("white")]
+
+def image_to_data_uri(image) -> str:
+    """Encode a QImage as a PNG data URI."""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return f"data:image/png;base64,{base64.b64encode(bytes(data)).decode('ascii')}"
+
+def render_lite_card(husbando_file: str, file_path: str, style: Mapping[str, str]):
+    """
+    Paint the frame, rarity badge, title, and cropped portrait of a buddy into
+    one QImage, so the reviewer only has to show a plain image. Uses QImage
+    and QPainter only, so it is safe on a worker thread.
+    """
+    portrait = QImage(file_path)
+    if portrait.isNull():
+        return None
+    width, height = LITE_CARD_SIZE
+    scale = width / 270  # Image pixels per CSS pixel
+    pad = round(10 * scale)
+    portrait_rect = QRect(pad, round(64 * scale), width - 2 * pad, height - round(64 * scale) - pad)
+    portrait = portrait.scaled(portrait_rect.size(), Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
+    border = css_colors(style["container_border"])[0]
+    
+    card = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    card.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(card)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+    
+    # Frame
+    painter.setPen(QPen(border, 2 * scale))
+    painter.setBrush(QBrush(css_colors(style["container_bg"])[0]))
+    painter.drawRoundedRect(QRectF(scale, scale, width - 2 * scale, height - 2 * scale), 16 * scale, 16 * scale)
+    
+    # Badge
+    font = QFont("Arial")
+    font.setBold(True)
+    font.setPixelSize(round(11 * scale))
+    font.setLetterSpacing(QFont.SpacingType.AbsoluteSpacing, 2 * scale)
+    painter.setFont(font)
+    badge_width = QFontMetrics(font).horizontalAdvance(style["badge"]) + 40 * scale
+    badge_rect = QRectF((width - badge_width) / 2, 8 * scale, badge_width, 22 * scale)
+    gradient = QLinearGradient(badge_rect.topLeft(), badge_rect.bottomRight())
+    stops = css_colors(style["badge_bg"])
+    for i, color in enumerate(stops):
+        gradient.setColorAt(i / max(1, len(stops) - 1), color)
+    painter.setPen(QPen(css_colors(style["badge_border"])[0], scale))
+    painter.setBrush(QBrush(gradient))
+    painter.drawRoundedRect(badge_rect, 11 * scale, 11 * scale)
+    painter.setPen(QColor("white"))
+    painter.drawText(badge_rect, Qt.AlignmentFlag.AlignCenter, style["badge"])
+    
+    # Title
+    font.setPixelSize(round(16 * scale))
+    painter.setFont(font)
+    painter.setPen(QColor("#FDE68A"))
+    title_rect = QRectF(pad, 34 * scale, width - 2 * pad, 26 * scale)
+    title = QFontMetrics(font).elidedText(os.path.splitext(husbando_file)[0].upper(), Qt.TextElideMode.ElideRight, int(title_rect.width()))
+    painter.drawText(title_rect, Qt.AlignmentFlag.AlignCenter, title)
+    
+    # Portrait, center-cropped into a rounded frame
+    clip = QPainterPath()
+    clip.addRoundedRect(QRectF(portrait_rect), 10 * scale, 10 * scale)
+    painter.save()
+    painter.setClipPath(clip)
+    source = QRect((portrait.width() - portrait_rect.width()) // 2, (portrait.height() - portrait_rect.height()) // 2,
+                   portrait_rect.width(), portrait_rect.height())
+    painter.drawImage(portrait_rect, portrait, source)
+    painter.restore()
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    painter.setPen(QPen(border, 2 * scale))
+    painter.drawPath(clip)
+    painter.end()
+    return card
+
+def encode_lite_card(husbando_file: str, file_path: str, style: Mapping[str, str]) -> str:
+    """Render a lite card and return it as a data URI, or "" if the image can't be read."""
+    card = render_lite_card(husbando_file, file_path, style)
+    return image_to_data_uri(card) if card is not None else ""
+
+def get_lite_card(buddy: Tuple[str, str, str], style: Mapping[str, str]) -> str:
+    """
+    Return the pre-rendered card of a buddy as a data URI, rendering it on a
+    cache miss. Cards are cached per (file, rarity), so a rarity change gets
+    a new card, and are re-rendered when the image file's size or mtime
+    changes. Main thread only, since it uses the card cache.
+    """
+    husbando_file, rarity, file_path = buddy
+    key = get_lite_card_key(file_path)
+    if key is None:
+        return ""
+    src = get_cached_lite_card(husbando_file, rarity, key)
+    if not src:
+        src = encode_lite_card(husbando_file, file_path, style)
+        if src:
+            store_lite_card(husbando_file, rarity, key, src)
+    return src
+
+# -------------------------------
+# NEW: Buddy Rotation (overlays prepared in the background)
+# -------------------------------
+def render_overlay(buddy: Tuple[str, str, str], style: Mapping[str, str], overlay_mode: str,
+                   lite_card: str = "") -> Optional[Dict[str, Any]]:
+    """
+    Decode, scale, and encode a buddy's image and build its overlay.
+    Runs on a worker thread, so it only uses QImage and plain data; in lite
+    mode, a card rendered here is returned as "lite_card" for the main thread
+    to cache. lite_card is an already cached card to reuse.
+    """
+    husbando_file, _, file_path = buddy
+    if overlay_mode == "lite":
+        key = get_lite_card_key(file_path)
+        image_src = lite_card or (encode_lite_card(husbando_file, file_path, style) if key else "")
+        if not image_src:
+            return None
+        return {"buddy": buddy, "mode": overlay_mode, "html": build_lite_overlay_html(image_src, BUDDY_INFO_MARKER),
+                "lite_card": None if lite_card else (key, image_src)}
+    image = QImage(file_path)
+    if image.isNull():
+        return None
+    image = image.scaled(*OVERLAY_IMAGE_SIZE, Qt.AspectRatioMode.KeepAspectRatioByExpanding, Qt.TransformationMode.SmoothTransformation)
+    image_src = image_to_data_uri(image)
+    return {"buddy": buddy, "mode": overlay_mode, "html": build_overlay_html(husbando_file, image_src, BUDDY_INFO_MARKER, style)}
+
+def prepare_next_buddy():
+    """Pick the next buddy and render its overlay in the background."""
+    global preparing, next_overlay, prepare_generation
+    buddy = game.pick_next_buddy()
+    next_overlay = None
+    prepare_generation += 1
+    if buddy is None:
+        preparing = False
+        return
+    preparing = True
+    generation = prepare_generation
+    compiled = game.get_compiled_config()
+    style = compiled.overlay_styles.get(buddy[1], compiled.overlay_styles["common"])
+    overlay_mode = compiled.overlay_mode
+    # The card cache is only touched here and in on_done, both on the main thread
+    lite_card = ""
+    if overlay_mode == "lite":
+        key = get_lite_card_key(buddy[2])
+        lite_card = get_cached_lite_card(buddy[0], buddy[1], key) if key else ""
+
+    def on_done(future):
+        global preparing, next_overlay
+        result = future.result()
+        if result and result.get("lite_card"):
+            store_lite_card(buddy[0], buddy[1], *result["lite_card"])
+        if generation != prepare_generation:
+            return
+        preparing = False
+        next_overlay = result
+
+    mw.taskman.run_in_background(lambda: render_overlay(buddy, style, overlay_mode, lite_card), on_done)
+
+def maybe_rotate_buddy(card, context: str):
+    """
+    Switch to the prepared buddy when a rotation is due: every N answers in
+    "cards" mode, or when the card comes from another deck in "deck" mode.
+    If the next overlay isn't ready yet, the rotation waits for a later card.
+    Only cards shown in the reviewer count, not browser or editor previews.
+    """
+    global current_overlay, rotation_pending, last_deck_id
+    compiled = game.get_compiled_config()
+    if compiled.buddy_rotation == "off" or not context.startswith("review"):
+        return
+    snapshot = game.state.snapshot()
+    deck_id = getattr(card, "did", None)
+    if compiled.buddy_rotation == "deck":
+        if last_deck_id is not None and deck_id != last_deck_id:
+            rotation_pending = True
+    elif snapshot.rotation_answers >= compiled.buddy_rotation_cards:
+        rotation_pending = True
+    last_deck_id = deck_id
+    if snapshot.current_husbando is None and snapshot.collection:
+        rotation_pending = True  # The buddy died, bring in the next one
+    if not rotation_pending:
+        if next_overlay is None and not preparing:
+            prepare_next_buddy()
+        return
+    # A fusion since the overlay was rendered makes it outdated, as does losing the entry
+    next_entry = snapshot.collection.get(next_overlay["buddy"][0]) if next_overlay else None
+    if next_entry is None or next_entry["rarity"] != next_overlay["buddy"][1]:
+        if not preparing:
+            prepare_next_buddy()
+        return
+    rotation_pending = False
+    current_overlay = next_overlay
+    game.rotate_buddy(current_overlay["buddy"][0])
+    prepare_next_buddy()
+
+def append_husbando_to_qa(html, card, context):
+    """Inject husbando display into the review HTML."""
+
+    compiled = game.get_compiled_config()
+    maybe_rotate_buddy(card, context)
+    snapshot = game.state.snapshot()
+    buddy = snapshot.current_husbando
+    if not game.show_during_review or not buddy:
+        return html
+
+    # Build buddy info if available
+    husbando_file, rarity, file_path = buddy
+    # Fusion upgrades the entry without touching current_husbando, so the card and style follow the entry
+    if husbando_file in snapshot.collection:
+        rarity = snapshot.collection[husbando_file]["rarity"]
+        buddy = (husbando_file, rarity, file_path)
+    buddy_info = get_buddy_info(husbando_file, compiled.overlay_mode)
+
+    if not os.path.exists(file_path):
+        tooltip(f"Image file not found: {file_path}")
+        return html
+    if husbando_file in game.image_problems:
+        tooltip(f"Can't show {os.path.splitext(husbando_file)[0]}: {game.image_problems[husbando_file]}")
+        return html
+    
+    if current_overlay and current_overlay["buddy"] == buddy and current_overlay["mode"] == compiled.overlay_mode:
+        return html + current_overlay["html"].replace(BUDDY_INFO_MARKER, buddy_info)
+    
+    style = compiled.overlay_styles.get(rarity, compiled.overlay_styles["common"])
+    if compiled.overlay_mode == "lite":
+        image_src = get_lite_card(buddy, style)
+        return html + build_lite_overlay_html(image_src, buddy_info) if image_src else html
+    image_src = encode_image_to_base64(file_path)
+
+    return html + build_overlay_html(husbando_file, image_src, buddy_info, style)
+
+def on_card_answered(reviewer, card, ease):
+    """Apply the answer's HP, XP, and point rewards to the current buddy."""
+    # Make sure ease is a number, not a Card object
+    ease_value = int(ease) if isinstance(ease, (int, str)) else 0
+    game.apply_answer(ease_value)
+
+def handle_answer(reviewer, card, ease):
+    """reviewer_did_answer_card hook; registered once, so each answer is applied once."""
+    on_card_answered(reviewer, card, ease)
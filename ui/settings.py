@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Settings dialog.
+"""
+
+from aqt import mw
+from aqt.qt import *
+from aqt.utils import tooltip
+
+from ..core import game
+from ..core.constants import DEFAULT_PULL_COST, DEFAULT_REWARDS, DEFAULT_ROTATION_CARDS
+
+ROTATION_CHOICES = {"Off": "off", "Every N cards": "cards", "Per deck": "deck"}
+
+
+def open_settings_dialog():
+    """Open settings dialog."""
+    config = game.config
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Husbando Gacha Settings")
+    dialog.setMinimumSize(400, 300)
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    folder_label = QLabel("Husbando Images Folder:")
+    layout.addWidget(folder_label)
+    
+    folder_layout = QHBoxLayout()
+    folder_edit = QLineEdit(game.husbando_folder)
+    folder_layout.addWidget(folder_edit)
+    
+    folder_btn = QPushButton("Browse...")
+    folder_btn.clicked.connect(lambda: browse_folder(folder_edit))
+    folder_layout.addWidget(folder_btn)
+    layout.addLayout(folder_layout)
+    
+    show_review_check = QCheckBox("Show husbando during review")
+    show_review_check.setChecked(game.show_during_review)
+    layout.addWidget(show_review_check)
+    
+    lite_overlay_check = QCheckBox("Lite overlay (faster on machines without a GPU)")
+    lite_overlay_check.setChecked(game.get_compiled_config().overlay_mode == "lite")
+    layout.addWidget(lite_overlay_check)
+    
+    rotation_layout = QHBoxLayout()
+    rotation_layout.addWidget(QLabel("Rotate buddy:"))
+    rotation_combo = QComboBox()
+    rotation_combo.addItems(list(ROTATION_CHOICES))
+    compiled = game.get_compiled_config()
+    rotation_combo.setCurrentIndex(list(ROTATION_CHOICES.values()).index(compiled.buddy_rotation))
+    rotation_layout.addWidget(rotation_combo)
+    rotation_spin = QSpinBox()
+    rotation_spin.setMinimum(1)
+    rotation_spin.setMaximum(1000)
+    rotation_spin.setValue(config.get("buddyRotationCards", DEFAULT_ROTATION_CARDS))
+    rotation_spin.setSuffix(" cards")
+    rotation_spin.setEnabled(compiled.buddy_rotation == "cards")
+    rotation_combo.currentIndexChanged.connect(
+        lambda _: rotation_spin.setEnabled(ROTATION_CHOICES[rotation_combo.currentText()] == "cards"))
+    rotation_layout.addWidget(rotation_spin)
+    layout.addLayout(rotation_layout)
+    
+    cost_layout = QHBoxLayout()
+    cost_label = QLabel("Points per Pull:")
+    cost_layout.addWidget(cost_label)
+    
+    cost_spin = QSpinBox()
+    cost_spin.setMinimum(1)
+    cost_spin.setMaximum(1000)
+    cost_spin.setValue(config.get("pullCost", DEFAULT_PULL_COST))
+    cost_layout.addWidget(cost_spin)
+    layout.addLayout(cost_layout)
+    
+    layout.addWidget(QLabel("<h3>Reward Points</h3>"))
+    rewards = config.get("rewards", DEFAULT_REWARDS)
+    reward_grid = QGridLayout()
+    reward_grid.addWidget(QLabel("Correct answer:"), 0, 0)
+    correct_spin = QSpinBox()
+    correct_spin.setValue(rewards.get("reviewCorrect", 1))
+    reward_grid.addWidget(correct_spin, 0, 1)
+    reward_grid.addWidget(QLabel("Hard answer:"), 1, 0)
+    hard_spin = QSpinBox()
+    hard_spin.setValue(rewards.get("reviewHard", 1))
+    reward_grid.addWidget(hard_spin, 1, 1)
+    reward_grid.addWidget(QLabel("Wrong answer:"), 2, 0)
+    wrong_spin = QSpinBox()
+    wrong_spin.setValue(rewards.get("reviewWrong", 0))
+    reward_grid.addWidget(wrong_spin, 2, 1)
+    layout.addLayout(reward_grid)
+    
+    button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+    button_box.accepted.connect(lambda: save_settings(
+        dialog,
+        folder_edit.text(),
+        cost_spin.value(),
+        correct_spin.value(),
+        hard_spin.value(),
+        wrong_spin.value(),
+        show_review_check.isChecked(),
+        ROTATION_CHOICES[rotation_combo.currentText()],
+        rotation_spin.value(),
+        "lite" if lite_overlay_check.isChecked() else "full"
+    ))
+    button_box.rejected.connect(dialog.reject)
+    layout.addWidget(button_box)
+    
+    dialog.exec()
+
+def browse_folder(line_edit):
+    """Open folder browser dialog."""
+    folder = QFileDialog.getExistingDirectory(mw, "Select Husbando Images Folder", line_edit.text())
+    if folder:
+        line_edit.setText(folder)
+
+def save_settings(dialog, folder, pull_cost, correct, hard, wrong, show_review, rotation, rotation_cards, overlay_mode):
+    """Save settings and close dialog."""
+    config = game.config
+    previous_folder = game.husbando_folder
+    config["husbandoFolder"] = folder
+    config["pullCost"] = pull_cost
+    config["showDuringReview"] = show_review
+    config["buddyRotation"] = rotation
+    config["buddyRotationCards"] = rotation_cards
+    config["overlayMode"] = overlay_mode
+    config["rewards"]["reviewCorrect"] = correct
+    config["rewards"]["reviewHard"] = hard
+    config["rewards"]["reviewWrong"] = wrong
+    game.save_config()  # Recompiles the snapshot and loads a newly selected folder
+    if folder == previous_folder:
+        game.load_husbando_images()
+    dialog.accept()
+    tooltip("Settings saved!")
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+In-game shop dialog.
+"""
+
+from aqt import mw
+from aqt.qt import *
+
+from ..core import game
+from ..core.constants import SHOP_ITEMS
+from .common import subscribe_dialog
+
+
+def open_shop_dialog():
+    """Open the in-game shop where you can spend points on bonuses and cosmetics."""
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Husbando Shop")
+    dialog.setMinimumSize(400, 300)
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    points_label = QLabel(f"Current Points: {game.state.user_points}")
+    layout.addWidget(points_label)
+    subscribe_dialog(dialog, "points_changed", lambda points: points_label.setText(f"Current Points: {points}"))
+    
+    for item in SHOP_ITEMS:
+        item_widget = QWidget()
+        item_layout = QHBoxLayout()
+        item_widget.setLayout(item_layout)
+        label = QLabel(f"{item['name']} - {item['description']} (Cost: {item['cost']})")
+        item_layout.addWidget(label)
+        buy_btn = QPushButton("Buy")
+        # Use lambda to pass the current item to shop_buy_action
+        buy_btn.clicked.connect(lambda _, i=item: game.shop_buy_action(i))
+        item_layout.addWidget(buy_btn)
+        layout.addWidget(item_widget)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    layout.addWidget(close_btn)
+    dialog.exec()
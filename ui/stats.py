@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Statistics dialog.
+"""
+
+import os
+
+from aqt import mw
+from aqt.qt import *
+
+from ..core import game
+from ..core.analytics import answer_log
+from ..core.store import HusbandoStore
+from .common import subscribe_dialog
+
+
+def get_stats_text() -> str:
+    """Build the statistics summary shown in the stats dialog."""
+    snapshot = game.state.snapshot()
+    buddy_info = ""
+    if snapshot.current_husbando:
+        husbando_file, _, _ = snapshot.current_husbando
+        if husbando_file in snapshot.collection:
+            buddy = snapshot.collection[husbando_file]
+            level, xp, xp_to_next = game.get_xp_progress(buddy)
+            buddy_info = f"<p><b>Current Buddy:</b> {os.path.splitext(husbando_file)[0]}<br>Level: {level} (XP: {xp}/{xp_to_next or 'MAX'})</p>"
+    
+    stats_text = f"""
+    <h3>Statistics</h3>
+    <p>Points: {snapshot.user_points}</p>
+    {buddy_info}
+    <p>Total Pulls: {sum([data['count'] for data in snapshot.collection.values()])}</p>
+    """
+    return stats_text
+
+def get_session_text() -> str:
+    """Build the session view: points per hour, ease mix, and the buddy's HP trajectory."""
+    summary = answer_log.session_summary()
+    if not summary["answers"]:
+        return "<h3>This Session</h3><p>No answers yet.</p>"
+    ease_names = {1: "Again", 2: "Hard", 3: "Good", 4: "Easy"}
+    ease_mix = ", ".join(
+        f"{ease_names[ease]} {count * 100 // summary['answers']}%"
+        for ease, count in summary["ease_mix"].items()
+    )
+    hp = summary["hp_trajectory"]
+    # One block character per sample, from 0 HP to 100 HP
+    sparkline = "".join("▁▂▃▄▅▆▇█"[min(value * 8 // 101, 7)] for value in hp)
+    hp_line = f"<p>Buddy HP: <span style='font-family:monospace;'>{sparkline}</span> ({hp[-1]}/100)</p>" if hp else ""
+    return f"""
+    <h3>This Session</h3>
+    <p>Answers: {summary['answers']}<br>
+    Points: {summary['points']} ({summary['points_per_hour']:.0f} per hour)<br>
+    Ease mix: {ease_mix}</p>
+    {hp_line}
+    """
+
+def get_drop_rate_text() -> str:
+    """Build the drop-rate table: observed rates of base-rate pulls against the configured chances."""
+    report = game.get_drop_rate_report()
+    if not report["base_pulls"]:
+        return "<h3>Drop Rates</h3><p>No pulls recorded yet.</p>"
+    rows = []
+    for row in report["rows"]:
+        low, high = row["interval"]
+        color = "" if row["consistent"] else " style='color:#DC2626;'"
+        rows.append(
+            f"<tr{color}><td>{row['rarity'].capitalize()}</td><td>{row['configured']:.1%}</td>"
+            f"<td>{row['observed']:.1%} ({row['hits']})</td><td>{low:.1%} - {high:.1%}</td></tr>"
+        )
+    untracked = ""
+    if report["untracked"]:
+        names = ", ".join(name.capitalize() for name in report["untracked"])
+        untracked = f"<p>Custom rarities aren't tracked in the pull history: {names}</p>"
+    return f"""
+    <h3>Drop Rates</h3>
+    <p>{report['base_pulls']} of {report['pulls']} recorded pulls used the base rates (no pity boost or ticket).</p>
+    <table cellspacing="6">
+    <tr><th align="left">Rarity</th><th align="left">Configured</th><th align="left">Observed</th><th align="left">95% interval</th></tr>
+    {"".join(rows)}
+    </table>
+    {untracked}
+    """
+
+def open_stats_dialog():
+    """Display user statistics and progress for your current buddy."""
+    dialog = QDialog(mw)
+    dialog.setWindowTitle("Your Stats")
+    dialog.setMinimumSize(400, 300)
+    layout = QVBoxLayout()
+    dialog.setLayout(layout)
+    
+    stats_label = QLabel(get_stats_text())
+    stats_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
+    layout.addWidget(stats_label)
+    # The summary is a single label, so any change simply re-renders its text
+    refresh_stats = lambda *_: stats_label.setText(get_stats_text())
+    
+    session_label = QLabel(get_session_text())
+    session_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
+    layout.addWidget(session_label)
+    # Every answer awards points, so points_changed also refreshes the session view
+    subscribe_dialog(dialog, "points_changed", lambda *_: session_label.setText(get_session_text()))
+
+    drop_rate_label = QLabel(get_drop_rate_text())
+    drop_rate_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
+    layout.addWidget(drop_rate_label)
+    for event in HusbandoStore.EVENTS:
+        subscribe_dialog(dialog, event, refresh_stats)
+    
+    close_btn = QPushButton("Close")
+    close_btn.clicked.connect(dialog.accept)
+    layout.addWidget(close_btn)
+    dialog.exec()